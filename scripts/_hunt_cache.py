@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of the tokenized hunt corpus for test scripts.
+
+Tokenizing every hunt in Flames/ is repeated by each test invocation even
+though the corpus rarely changes. load_corpus() keys a compressed cache
+file on the file paths + mtimes so the tokenization work happens once per
+corpus change and later runs just memory-map the saved arrays.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+REPO_ROOT = Path(__file__).parent.parent
+HUNT_DIR = REPO_ROOT / "Flames"
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+WORD_PATTERN = re.compile(r"\w{3,}")
+
+
+def _corpus_signature(paths: List[Path]) -> str:
+    """Digest of paths + mtimes; changes whenever the corpus does."""
+    payload = b"|".join(
+        f"{path}:{os.path.getmtime(path)}".encode() for path in paths
+    )
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+# Single pass over the raw bytes: hypothesis is the first substantial
+# line after the title, tactic is the third cell of the table data row
+HUNT_RE = re.compile(
+    rb"\A#[^\n]*\n\s*(?P<hyp>[^#|\n][^\n]{20,})"
+    rb"(?:.*?\n\|\s*[A-Za-z]+\d+[^|\n]*\|[^|\n]*\|\s*(?P<tac>[^|\n]+?)\s*\|)?",
+    re.S,
+)
+
+
+def parse_hunt(path: Path) -> Tuple[str, str]:
+    """Extract (hypothesis, tactic) from a hunt file via mmap.
+
+    Avoids decoding and splitting the whole file into a line list; the
+    compiled pattern runs directly over the memory-mapped bytes.
+    """
+    if os.path.getsize(path) == 0:
+        return "", "Unknown"
+
+    with open(path, 'rb') as handle, \
+            mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        match = HUNT_RE.search(mapped)
+        if not match:
+            return "", "Unknown"
+        hypothesis = match['hyp'].decode(errors='replace').strip()
+        tactic = match['tac'].decode(errors='replace').strip() if match['tac'] else "Unknown"
+
+    return hypothesis, tactic
+
+
+# Below this size the process-pool startup costs more than it saves
+_PARALLEL_THRESHOLD = 64
+
+
+def _build_corpus(paths: List[Path]) -> Tuple[List[str], List[str]]:
+    if len(paths) >= _PARALLEL_THRESHOLD:
+        from concurrent.futures import ProcessPoolExecutor
+
+        workers = os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = list(pool.map(
+                parse_hunt, paths,
+                chunksize=max(1, len(paths) // (4 * workers))
+            ))
+    else:
+        parsed = [parse_hunt(path) for path in paths]
+
+    ids, hypotheses = [], []
+    for path, (hypothesis, _) in zip(paths, parsed):
+        if hypothesis:
+            ids.append(path.stem)
+            hypotheses.append(hypothesis)
+    return ids, hypotheses
+
+
+# Bump when the cached file layout changes
+_CACHE_FORMAT = "v2"
+
+
+def quantize_embeddings(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize FP32 embedding rows to int8 with a per-row scale.
+
+    Cuts storage and bandwidth 4x; cosine similarity is recovered from
+    int8 dot products by dividing out the two scales.
+    """
+    peaks = np.maximum(np.abs(embeddings).max(axis=1, keepdims=True), 1e-9)
+    scales = (127.0 / peaks).astype(np.float32)
+    return (embeddings * scales).round().astype(np.int8), scales
+
+
+def int8_cosine(corpus_q: np.ndarray, corpus_scales: np.ndarray,
+                query_q: np.ndarray, query_scale: float) -> np.ndarray:
+    """Cosine similarity of a query against the corpus via int8 MACs."""
+    dots = corpus_q.astype(np.int32) @ query_q.astype(np.int32)
+    return dots.astype(np.float32) / (corpus_scales.ravel() * query_scale)
+
+
+def _embed(texts: List[str], vocab: List[str]) -> np.ndarray:
+    """Deterministic L2-normalized term-frequency embeddings."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(vocabulary=vocab, use_idf=False,
+                                 token_pattern=WORD_PATTERN.pattern)
+    return vectorizer.fit_transform(texts).toarray().astype(np.float32)
+
+
+def embed_query(text: str, vocab: List[str]) -> Tuple[np.ndarray, float]:
+    """Embed and quantize a single query hypothesis."""
+    quantized, scales = quantize_embeddings(_embed([text], vocab))
+    return quantized[0], float(scales[0, 0])
+
+
+def load_corpus() -> Tuple[List[str], csr_matrix, List[str]]:
+    """Load (hunt_ids, token_matrix, vocab) for the Flames/ corpus.
+
+    The token matrix is a hunts x vocabulary boolean CSR matrix ready for
+    batched similarity math. Results are cached under scripts/.cache and
+    reused until any hunt file changes.
+    """
+    ids, matrix, vocab, _, _ = _load_all()
+    return ids, matrix, vocab
+
+
+def load_quantized_embeddings() -> Tuple[List[str], np.ndarray, np.ndarray, List[str]]:
+    """Load (hunt_ids, int8_embeddings, scales, vocab) for the corpus."""
+    ids, _, vocab, emb_q, emb_scales = _load_all()
+    return ids, emb_q, emb_scales, vocab
+
+
+def _load_all():
+    paths = sorted(HUNT_DIR.glob("*.md"))
+    cache_file = CACHE_DIR / f"corpus-{_CACHE_FORMAT}-{_corpus_signature(paths)}.npz"
+
+    if cache_file.exists():
+        cached = np.load(cache_file, allow_pickle=False)
+        matrix = csr_matrix(
+            (cached['data'], cached['indices'], cached['indptr']),
+            shape=tuple(cached['shape'])
+        )
+        return (list(cached['ids']), matrix, list(cached['vocab']),
+                cached['emb_q'], cached['emb_scales'])
+
+    ids, hypotheses = _build_corpus(paths)
+
+    vocab = {}
+    rows, cols = [], []
+    for row, hypothesis in enumerate(hypotheses):
+        for token in set(WORD_PATTERN.findall(hypothesis.lower())):
+            col = vocab.setdefault(token, len(vocab))
+            rows.append(row)
+            cols.append(col)
+
+    matrix = csr_matrix(
+        (np.ones(len(rows), dtype=np.bool_), (rows, cols)),
+        shape=(len(ids), len(vocab))
+    )
+
+    vocab_list = list(vocab)
+    emb_q, emb_scales = quantize_embeddings(_embed(hypotheses, vocab_list))
+
+    CACHE_DIR.mkdir(exist_ok=True)
+    np.savez_compressed(
+        cache_file,
+        data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+        shape=np.array(matrix.shape),
+        ids=np.array(ids), vocab=np.array(vocab_list),
+        emb_q=emb_q, emb_scales=emb_scales
+    )
+
+    return ids, matrix, vocab_list, emb_q, emb_scales
+
+
+if __name__ == "__main__":
+    hunt_ids, token_matrix, vocab = load_corpus()
+    print(f"Corpus: {len(hunt_ids)} hunts, {len(vocab)} tokens")
+    print(f"Cache dir: {CACHE_DIR}")
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Buffered stdout helper for the print-heavy test scripts.
+
+Under CI, stdout is a pipe and every print() flushes line-by-line.
+Collecting the whole run in a StringIO and writing it once at the end
+turns dozens of syscalls into a single write + flush.
+"""
+
+import io
+import sys
+from contextlib import contextmanager
+
+
+def fmt_pct(value):
+    """Format a ratio as a percentage without the locale-aware % spec."""
+    return f"{value * 100:.1f}%"
+
+
+@contextmanager
+def buffered_stdout():
+    """Swap sys.stdout for a buffer; emit everything in one final write."""
+    buffer = io.StringIO()
+    original = sys.stdout
+    sys.stdout = buffer
+    try:
+        yield buffer
+    finally:
+        sys.stdout = original
+        original.write(buffer.getvalue())
+        original.flush()
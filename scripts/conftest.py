@@ -0,0 +1,10 @@
+"""Shared pytest configuration for the standalone test scripts.
+
+Puts scripts/ on sys.path so the test modules import their neighbours the
+same way under pytest (including xdist workers) as when run directly.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
@@ -35,12 +35,23 @@ class ConfigurationError(HearthError):
 
 
 class ValidationError(HearthError):
-    """Raised when input validation fails."""
-    
-    def __init__(self, field: str, value: str, message: str = "Validation failed"):
+    """Raised when input validation fails.
+
+    The message is assembled lazily in __str__ - constructing the error
+    never stringifies the offending value, so raising over a large hunt
+    dict stays O(1) and callers that only read .field pay nothing. The
+    constructor arguments go into args so Exception's default __reduce__
+    round-trips the error through pickle (e.g. out of a process pool).
+    """
+
+    def __init__(self, field: str, value, message: str = "Validation failed"):
         self.field = field
         self.value = value
-        super().__init__(f"{message}: {field} = '{value}'")
+        self.message = message
+        super().__init__(field, value, message)
+
+    def __str__(self) -> str:
+        return f"{self.message}: {self.field} = '{self.value}'"
 
 
 class AIAnalysisError(HearthError):
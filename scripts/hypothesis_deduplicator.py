@@ -4,9 +4,36 @@ TTP-aware hypothesis deduplicator for ensuring diverse hunt generation.
 """
 
 from typing import Dict, Any, Optional, Tuple, List
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+import hashlib
+import heapq
+import operator
+import os
+import re
+import sqlite3
+import threading
 import time
 import json
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency (pypy3 env)
+    np = None
+
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:  # pragma: no cover - optional dependency
+    MinHash = MinHashLSH = None
+
+try:
+    import simsimd
+except ImportError:  # pragma: no cover - optional dependency
+    simsimd = None
 
 from logger_config import get_logger
 from config_manager import get_config
@@ -15,6 +42,72 @@ from ttp_diversity_checker import get_ttp_diversity_checker, TTProverlap
 logger = get_logger()
 config = get_config().config
 
+# Fixed dimensionality of the hashed bag-of-words embeddings kept in the
+# dedup index; hashing avoids carrying a vocabulary in the database
+EMBED_DIM = 256
+
+
+def _embed_hypothesis(text: str) -> "np.ndarray":
+    """Hashed bag-of-words embedding of a hypothesis (crc32 is stable
+    across processes, unlike the salted builtin hash)."""
+    vector = np.zeros(EMBED_DIM, dtype=np.float32)
+    for word in text.lower().split():
+        vector[zlib.crc32(word.encode('utf8')) % EMBED_DIM] += 1.0
+    return vector
+
+
+def _quantize_embedding(vector: "np.ndarray") -> Tuple["np.ndarray", float]:
+    """Quantize FP32 to int8 with a per-vector scale (4x smaller rows)."""
+    peak = np.abs(vector).max()
+    scale = 127.0 / peak if peak > 0 else 1.0
+    return (vector * scale).round().astype(np.int8), float(scale)
+
+
+# Filler words dropped before hashing so trivial rewordings of the same
+# hypothesis ("the adversary" vs "an adversary") collapse to one digest
+_HASH_STOPWORDS = frozenset({
+    'a', 'an', 'the', 'to', 'of', 'for', 'and', 'or', 'in', 'on', 'with',
+    'is', 'are', 'that', 'this', 'by', 'from',
+})
+
+
+def _normalized_digest(text: str, tactic: str = "") -> bytes:
+    """Digest over case-folded, whitespace-collapsed, stopword-free text.
+
+    blake2b at 16 bytes: these keys feed in-process caches, which need
+    speed and uniqueness, not adversarial collision resistance.
+    """
+    words = re.sub(r"\s+", " ", text.lower()).strip().split()
+    kept = " ".join(word for word in words if word not in _HASH_STOPWORDS)
+    return hashlib.blake2b(
+        f"{kept}\x00{tactic.lower()}".encode('utf8'), digest_size=16
+    ).digest()
+
+
+def _char_trigram_minhash(text: str) -> "MinHash":
+    """MinHash over character 3-grams of the lowercased text.
+
+    Character shingles make the sketch robust to word-order and small
+    edits, which is what the LSH tier needs to spot near-identical
+    hypotheses cheaply.
+    """
+    sketch = MinHash(num_perm=TTProvAwareDeduplicator.LSH_NUM_PERM)
+    normalized = text.lower()
+    for i in range(max(len(normalized) - 2, 1)):
+        sketch.update(normalized[i:i + 3].encode('utf8'))
+    return sketch
+
+
+def _parse_hunt_worker(path_str: str):
+    """Read and parse one hunt file (module-level so pools can pickle it)."""
+    try:
+        stat = os.stat(path_str)
+        content = Path(path_str).read_text()
+        info = TTProvAwareDeduplicator._extract_hunt_info_from_content(content, path_str)
+        return path_str, stat.st_mtime, stat.st_size, info
+    except Exception:
+        return path_str, 0.0, 0, None
+
 
 @dataclass
 class DeduplicationResult:
@@ -53,18 +146,329 @@ class DeduplicationResult:
 class TTProvAwareDeduplicator:
     """TTP-aware deduplicator that ensures diverse hunt hypotheses."""
     
+    # Parsed hunt files are cached here keyed by path+mtime+size so repeat
+    # uniqueness checks (and later runs) skip re-reading unchanged files
+    INDEX_PATH = Path(__file__).parent / ".cache" / "dedup_index.sqlite"
+
+    # Above this many candidates, the int8 embeddings narrow the field
+    # before exact per-pair scoring; below it, brute scoring is cheaper
+    EXACT_SCORING_LIMIT = 200
+    PREFILTER_KEEP = 50
+
+    # Cache misses fan out to worker processes above this count; the
+    # directory glob itself is reused for a few seconds between checks
+    _PARALLEL_THRESHOLD = 64
+    _GLOB_TTL = 5.0
+
+    # LSH tier over the hunt corpus: only candidates whose char-3-gram
+    # Jaccard can clear this threshold are worth exact scoring
+    LSH_THRESHOLD = 0.85
+    LSH_NUM_PERM = 128
+
     def __init__(self, similarity_threshold: float = 0.75):
         self.similarity_threshold = similarity_threshold
         self.ttp_checker = get_ttp_diversity_checker()  # Use global instance
+        self._index = None
+        self._listing = None
+        self._listing_time = 0.0
+        # Exact-match tier, two levels: the outer dict partitions by
+        # tactic (a dozen buckets at most) so each inner LRU stays small
+        # and hot; inner keys pair the text digest with the history
+        # length, so history growth invalidates naturally
+        self._result_cache: Dict[str, OrderedDict] = {}
+        self._seen_hashes: set = set()
+        # Sub-linear candidate retrieval over the hunt corpus; None when
+        # datasketch is not installed (brute scoring still works)
+        self._lsh = (MinHashLSH(threshold=self.LSH_THRESHOLD,
+                                num_perm=self.LSH_NUM_PERM)
+                     if MinHashLSH is not None else None)
+        self._lsh_paths: set = set()
+        # Quantized corpus embeddings resident in RAM: int8 rows cost a
+        # quarter of FP32 and the prefilter never re-reads sqlite blobs
+        self._embedding_rows: Dict[str, "np.ndarray"] = {}
+        # Text-keyed embeddings, memoized in memory and persisted in the
+        # index so repeated runs never re-encode the same hypothesis
+        self._text_embeddings: Dict[bytes, "np.ndarray"] = {}
+        # Guards the insert paths (sqlite upserts, LSH inserts) when the
+        # batch API fans corpus comparisons out across threads
+        self._insert_lock = threading.Lock()
         logger.info("TTP-aware hypothesis deduplicator initialized")
-    
-    def check_hypothesis_uniqueness(self, new_hypothesis: str, tactic: str = "", 
-                                  tags: List[str] = None) -> DeduplicationResult:
+
+    def _load_index(self) -> Optional[sqlite3.Connection]:
+        """Open (creating if needed) the persistent hunt-parse index."""
+        if self._index is None:
+            try:
+                self.INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+                self._index = sqlite3.connect(self.INDEX_PATH,
+                                              check_same_thread=False)
+                self._index.execute(
+                    "CREATE TABLE IF NOT EXISTS hunts ("
+                    "path TEXT PRIMARY KEY, mtime REAL, size INTEGER, "
+                    "hypothesis TEXT, tactic TEXT, snippet TEXT, "
+                    "embedding BLOB, scale REAL)"
+                )
+                self._index.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "digest BLOB PRIMARY KEY, vector BLOB)"
+                )
+                try:
+                    self._index.execute("SELECT embedding FROM hunts LIMIT 1")
+                except sqlite3.OperationalError:
+                    # Index predates the embedding columns; rebuild it
+                    self._index.execute("DROP TABLE hunts")
+                    self._index.execute(
+                        "CREATE TABLE hunts ("
+                        "path TEXT PRIMARY KEY, mtime REAL, size INTEGER, "
+                        "hypothesis TEXT, tactic TEXT, snippet TEXT, "
+                        "embedding BLOB, scale REAL)"
+                    )
+            except Exception as error:
+                logger.warning(f"Could not open dedup index: {error}")
+                self._index = None
+        return self._index
+
+    def _cached_hunt_info(self, hunt_file: Path) -> Optional[Dict[str, Any]]:
+        """Indexed parse result for a hunt file, or None if stale/missing."""
+        index = self._load_index()
+        if index is None:
+            return None
+
+        stat = hunt_file.stat()
+        row = index.execute(
+            "SELECT hypothesis, tactic, snippet FROM hunts "
+            "WHERE path = ? AND mtime = ? AND size = ?",
+            (str(hunt_file), stat.st_mtime, stat.st_size)
+        ).fetchone()
+        if row is None:
+            return None
+
+        return {
+            'filepath': str(hunt_file),
+            'filename': hunt_file.name,
+            'hypothesis': row[0],
+            'tactic': row[1],
+            'content': row[2]
+        }
+
+    def _find_hunt_files(self) -> List[Path]:
+        """Hunt markdown files across all hunt directories.
+
+        The glob listing is reused for a few seconds so back-to-back
+        uniqueness checks do not re-walk the directories.
+        """
+        now = time.monotonic()
+        if self._listing is not None and now - self._listing_time < self._GLOB_TTL:
+            return self._listing
+
+        files = []
+        for directory_name in ("Flames", "Embers", "Alchemy"):
+            directory_path = Path(directory_name)
+            if directory_path.exists():
+                files.extend(sorted(directory_path.glob("*.md")))
+
+        self._listing = files
+        self._listing_time = now
+        return files
+
+    def _bulk_parse(self, paths: List[Path]) -> List[Dict[str, Any]]:
+        """Parse many hunt files, fanning index misses out across cores.
+
+        Files whose path+mtime+size match the sqlite index are served from
+        it; the rest are parsed (in worker processes when there are enough
+        to amortize pool startup) and upserted in one transaction.
+        """
+        results = {}
+        misses = []
+        for path in paths:
+            try:
+                cached = self._cached_hunt_info(path)
+            except OSError:
+                continue
+            if cached is not None:
+                results[str(path)] = cached
+            else:
+                misses.append(str(path))
+
+        if len(misses) >= self._PARALLEL_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+                parsed = list(pool.map(_parse_hunt_worker, misses))
+        else:
+            parsed = [_parse_hunt_worker(path) for path in misses]
+
+        index = self._load_index()
+        with self._insert_lock:
+            for path_str, mtime, size, hunt_info in parsed:
+                if not hunt_info:
+                    continue
+                results[path_str] = hunt_info
+                if index is not None:
+                    blob, scale = None, None
+                    if np is not None:
+                        quantized, scale = _quantize_embedding(
+                            _embed_hypothesis(hunt_info['hypothesis'])
+                        )
+                        self._embedding_rows[path_str] = quantized
+                        blob = quantized.tobytes()
+                    index.execute(
+                        "INSERT OR REPLACE INTO hunts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (path_str, mtime, size,
+                         hunt_info['hypothesis'], hunt_info['tactic'], hunt_info['content'],
+                         blob, scale)
+                    )
+            if index is not None:
+                index.commit()
+
+        return [results[str(path)] for path in paths if str(path) in results]
+
+    def _nearest_by_embedding(self, hypothesis: str,
+                              candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Narrow candidates to the closest matches by int8 cosine.
+
+        The quantized dot product runs on the stored int8 rows directly
+        (the per-vector scales cancel out of cosine), so the prefilter
+        touches a quarter of the memory an FP32 matrix would.
+        """
+        if not self._embedding_rows and self._load_index() is not None:
+            # Warm the resident rows once from the persistent index
+            self._embedding_rows = {
+                path: np.frombuffer(blob, dtype=np.int8)
+                for path, blob in self._index.execute(
+                    "SELECT path, embedding FROM hunts"
+                )
+                if blob is not None
+            }
+        stored = self._embedding_rows
+
+        # dict.get(key, default) evaluates the default eagerly, which
+        # would re-embed every candidate on every call; look up first and
+        # memoize the rows actually missing from the index
+        rows = []
+        for info in candidates:
+            row = stored.get(info['filepath'])
+            if row is None:
+                row = _quantize_embedding(_embed_hypothesis(info['hypothesis']))[0]
+                stored[info['filepath']] = row
+            rows.append(row)
+        matrix = np.vstack(rows)
+        query, _ = _quantize_embedding(self._embedding_for(hypothesis))
+
+        if simsimd is not None:
+            # One SIMD kernel call over the contiguous int8 matrix; the
+            # intrinsics accumulate int8 dots without widening to FP32
+            distances = simsimd.cdist(query[None, :], matrix, metric="cosine")
+            cosine = 1.0 - np.asarray(distances)[0]
+        else:
+            dots = matrix.astype(np.int32) @ query.astype(np.int32)
+            norms = (np.linalg.norm(matrix.astype(np.float32), axis=1)
+                     * np.linalg.norm(query.astype(np.float32)))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cosine = np.where(norms > 0, dots / norms, 0.0)
+
+        top = np.argpartition(cosine, -self.PREFILTER_KEEP)[-self.PREFILTER_KEEP:]
+        return [candidates[i] for i in top]
+
+    def _embedding_for(self, text: str) -> "np.ndarray":
+        """Embedding for a hypothesis, cached across calls and runs.
+
+        Keyed by the normalized-text digest: the in-memory dict serves
+        repeats within a process and the sqlite row serves later runs,
+        so clear_generation_history never forces re-encoding.
+        """
+        digest = _normalized_digest(text)
+        cached = self._text_embeddings.get(digest)
+        if cached is not None:
+            return cached
+
+        index = self._load_index()
+        if index is not None:
+            row = index.execute(
+                "SELECT vector FROM embeddings WHERE digest = ?", (digest,)
+            ).fetchone()
+            if row is not None:
+                vector = np.frombuffer(row[0], dtype=np.float32)
+                self._text_embeddings[digest] = vector
+                return vector
+
+        vector = _embed_hypothesis(text)
+        self._text_embeddings[digest] = vector
+        if index is not None:
+            with self._insert_lock:
+                index.execute(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                    (digest, vector.tobytes())
+                )
+                index.commit()
+        return vector
+
+    def _ensure_lsh_indexed(self, candidates: List[Dict[str, Any]]):
+        """Insert any not-yet-indexed hunts into the LSH index."""
+        with self._insert_lock:
+            for hunt_info in candidates:
+                path = hunt_info['filepath']
+                if path not in self._lsh_paths:
+                    self._lsh.insert(
+                        path, _char_trigram_minhash(hunt_info['hypothesis'])
+                    )
+                    self._lsh_paths.add(path)
+
+    def warmup(self):
+        """Preload the corpus-dependent state ahead of the first check.
+
+        Parses the hunt files into the sqlite index, loads the quantized
+        embedding rows, and populates the LSH index, so none of that
+        one-time cost is billed to the first hypothesis in a run.
+        """
+        candidates = [
+            hunt_info for hunt_info in self._bulk_parse(self._find_hunt_files())
+            if hunt_info['hypothesis']
+        ]
+        if self._lsh is not None:
+            self._ensure_lsh_indexed(candidates)
+        if np is not None and len(candidates) > self.PREFILTER_KEEP:
+            # Exercises the prefilter once, pulling the embedding rows
+            # into memory and touching the int8 kernel
+            self._nearest_by_embedding(candidates[0]['hypothesis'], candidates)
+        logger.info(f"Deduplicator warmed up over {len(candidates)} hunts")
+
+    def check_hypothesis_uniqueness(self, new_hypothesis: str, tactic: str = "",
+                                  tags: List[str] = None,
+                                  precomputed_similar_hunts: Optional[List[Dict[str, Any]]] = None
+                                  ) -> DeduplicationResult:
         """Check if hypothesis has diverse TTPs from previous attempts."""
+        # Exact-match tier before any similarity work: one dict/set probe
+        # on a 32-byte digest of the normalized text. Identical rechecks
+        # at the same history return the cached verdict; resubmissions of
+        # an already-checked hypothesis are duplicates by definition and
+        # skip the embedding and TTP pipeline entirely
+        digest = _normalized_digest(new_hypothesis, tactic)
+        cache_key = (digest, len(self.ttp_checker.generation_history))
+        bucket = self._result_cache.setdefault(tactic.lower(), OrderedDict())
+        cached = bucket.get(cache_key)
+        if cached is not None:
+            bucket.move_to_end(cache_key)
+            logger.info(f"Exact-match cache hit for: {new_hypothesis[:50]}...")
+            return cached
+        if digest in self._seen_hashes:
+            logger.info(f"Exact resubmission detected for: {new_hypothesis[:50]}...")
+            return DeduplicationResult(
+                is_duplicate=True,
+                similarity_threshold=0.5,
+                max_similarity_score=1.0,
+                similar_hunts_count=0,
+                similar_hunts=[],
+                recommendation="REJECT: Exact match of a previously checked hypothesis",
+                detailed_report="Normalized text digest matched a prior "
+                                "submission; full TTP analysis skipped."
+            )
+
         logger.info(f"Checking TTP diversity for: {new_hypothesis[:50]}...")
-        
-        # Load and compare against existing hunt files
-        similar_hunts = self._find_similar_existing_hunts(new_hypothesis, tactic)
+
+        # Load and compare against existing hunt files (the batch API
+        # precomputes these comparisons on a thread pool)
+        if precomputed_similar_hunts is not None:
+            similar_hunts = precomputed_similar_hunts
+        else:
+            similar_hunts = self._find_similar_existing_hunts(new_hypothesis, tactic)
         
         # Check TTP diversity against previous generation attempts
         ttp_overlap = self.ttp_checker.check_ttp_diversity(new_hypothesis, tactic)
@@ -101,8 +505,85 @@ class TTProvAwareDeduplicator:
         
         logger.info(f"TTP diversity check: {'SIMILAR TTPs' if is_too_similar else 'DIVERSE TTPs'}")
         logger.info(f"Found {len(similar_hunts)} similar existing hunts")
+
+        if len(bucket) >= 2048:
+            bucket.popitem(last=False)
+        bucket[cache_key] = result
+        self._seen_hashes.add(digest)
         return result
     
+    def check_hypothesis_uniqueness_batch(
+            self, pairs: List[Tuple[str, str]]) -> List[DeduplicationResult]:
+        """Check many (hypothesis, tactic) pairs in a single pass.
+
+        The hunt corpus is globbed and parsed once up front instead of
+        once per item, and the corpus comparisons fan out across threads.
+        Verdicts are still produced in order, so an approved hypothesis
+        is part of the history the later items are judged against. The
+        only divergence from looping over check_hypothesis_uniqueness is
+        the in-batch dedup below: items near-duplicating an earlier batch
+        item are rejected synthetically without a full TTP analysis.
+        """
+        if not pairs:
+            return []
+
+        # Warm the glob listing and parse index once so the per-item
+        # corpus comparisons below are pure cache hits
+        self._bulk_parse(self._find_hunt_files())
+
+        # The corpus comparisons are independent reads, so they fan out
+        # across threads; only the TTP verdicts below must stay in order
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            similar_per_item = list(pool.map(
+                lambda pair: self._find_similar_existing_hunts(*pair), pairs
+            ))
+
+        # In-batch dedup: items that are exact (by normalized digest) or
+        # near (MinHash Jaccard >= 0.9) duplicates of an earlier batch
+        # item are rejected synthetically, never reaching the checker
+        duplicate_of: List[Optional[int]] = [None] * len(pairs)
+        first_by_digest: Dict[bytes, int] = {}
+        kept: List[int] = []
+        sketches = ([_char_trigram_minhash(text) for text, _ in pairs]
+                    if MinHash is not None else None)
+        for position, (hypothesis, tactic) in enumerate(pairs):
+            digest = _normalized_digest(hypothesis, tactic)
+            earlier = first_by_digest.get(digest)
+            if earlier is None and sketches is not None:
+                earlier = next(
+                    (j for j in kept
+                     if sketches[position].jaccard(sketches[j]) >= 0.9),
+                    None
+                )
+            if earlier is not None:
+                duplicate_of[position] = earlier
+            else:
+                first_by_digest[digest] = position
+                kept.append(position)
+
+        results = []
+        for position, (hypothesis, tactic) in enumerate(pairs):
+            earlier = duplicate_of[position]
+            if earlier is not None:
+                logger.info(f"Batch item {position} duplicates item {earlier}")
+                results.append(DeduplicationResult(
+                    is_duplicate=True,
+                    similarity_threshold=0.5,
+                    max_similarity_score=1.0,
+                    similar_hunts_count=0,
+                    similar_hunts=[],
+                    recommendation="REJECT: Duplicate of an earlier "
+                                   "hypothesis in the same batch",
+                    detailed_report=f"Matched batch item {earlier + 1}; "
+                                    "full TTP analysis skipped."
+                ))
+                continue
+            results.append(self.check_hypothesis_uniqueness(
+                hypothesis, tactic,
+                precomputed_similar_hunts=similar_per_item[position]
+            ))
+        return results
+
     def generate_unique_hypothesis(self, generation_prompt: str, max_attempts: int = 5,
                                  ai_generator_func: callable = None) -> Tuple[str, DeduplicationResult]:
         """Generate hypothesis with diverse TTPs using iterative refinement."""
@@ -113,7 +594,30 @@ class TTProvAwareDeduplicator:
             hypothesis = self._generate_diverse_fallback_hypothesis()
             dedup_result = self.check_hypothesis_uniqueness(hypothesis)
             return hypothesis, dedup_result
-        
+
+        # Speculative batch: ask the generator for every candidate in one
+        # call and dedup them client-side, turning max_attempts serial
+        # round-trips into a single batched completion. Generators that
+        # only support the per-attempt signature fall through to the loop
+        try:
+            candidates = ai_generator_func(
+                self._enhance_prompt_for_ttp_diversity(generation_prompt, 0),
+                n=max_attempts
+            )
+        except TypeError:
+            candidates = None
+        if isinstance(candidates, list):
+            pairs = [(data.get('hypothesis', ''), data.get('tactic', ''))
+                     for data in candidates if data.get('hypothesis')]
+            batch_results = self.check_hypothesis_uniqueness_batch(pairs)
+            for (hypothesis, tactic), dedup_result in zip(pairs, batch_results):
+                if not dedup_result.is_duplicate:
+                    logger.info("Speculative batch yielded a diverse hypothesis")
+                    return hypothesis, dedup_result
+            logger.error(f"No diverse candidate among {len(pairs)} batched attempts")
+            fallback_hypothesis = self._generate_diverse_fallback_hypothesis()
+            return fallback_hypothesis, self.check_hypothesis_uniqueness(fallback_hypothesis)
+
         for attempt in range(max_attempts):
             logger.info(f"TTP diversity attempt {attempt + 1}/{max_attempts}")
             
@@ -281,45 +785,51 @@ Generate a hypothesis that covers completely different Tactics, Techniques, and
     def _find_similar_existing_hunts(self, new_hypothesis: str, tactic: str = "") -> List[Dict[str, Any]]:
         """Find similar existing hunt files and calculate similarity scores."""
         try:
-            from pathlib import Path
-            import re
-            
+            candidates = [
+                hunt_info for hunt_info in self._bulk_parse(self._find_hunt_files())
+                if hunt_info['hypothesis']
+            ]
+
+            # LSH tier: recall booster only, never a filter. The banded
+            # index catches near-verbatim rewrites the embedding prefilter
+            # can rank below its cutoff, but an empty query result only
+            # means nothing clears the 0.85 Jaccard threshold - moderately
+            # similar hunts (the 60% file-similarity rejection band) still
+            # have to come from exact scoring, so verdicts are identical
+            # with or without datasketch installed
+            hits = set()
+            if self._lsh is not None:
+                self._ensure_lsh_indexed(candidates)
+                hits = set(self._lsh.query(_char_trigram_minhash(new_hypothesis)))
+
+            if np is not None and len(candidates) > self.EXACT_SCORING_LIMIT:
+                kept = self._nearest_by_embedding(new_hypothesis, candidates)
+                if hits:
+                    kept_paths = {info['filepath'] for info in kept}
+                    kept.extend(info for info in candidates
+                                if info['filepath'] in hits
+                                and info['filepath'] not in kept_paths)
+                candidates = kept
+
             similar_hunts = []
-            hunt_directories = ["Flames", "Embers", "Alchemy"]
-            
-            for directory_name in hunt_directories:
-                directory_path = Path(directory_name)
-                if not directory_path.exists():
-                    continue
-                    
-                hunt_files = list(directory_path.glob("*.md"))
-                for hunt_file in hunt_files:
-                    try:
-                        content = hunt_file.read_text()
-                        hunt_info = self._extract_hunt_info_from_content(content, str(hunt_file))
-                        
-                        if hunt_info and hunt_info['hypothesis']:
-                            # Calculate similarity score
-                            similarity_score = self._calculate_hypothesis_similarity(
-                                new_hypothesis, hunt_info['hypothesis'], tactic, hunt_info['tactic']
-                            )
-                            
-                            hunt_info['similarity_score'] = similarity_score
-                            similar_hunts.append(hunt_info)
-                            
-                    except Exception as e:
-                        logger.warning(f"Error processing hunt file {hunt_file}: {e}")
-                        continue
-            
-            # Sort by similarity score (highest first) and return top 10
-            similar_hunts.sort(key=lambda x: x.get('similarity_score', 0), reverse=True)
-            return similar_hunts[:10]
+            for hunt_info in candidates:
+                hunt_info['similarity_score'] = self._calculate_hypothesis_similarity(
+                    new_hypothesis, hunt_info['hypothesis'], tactic, hunt_info['tactic']
+                )
+                similar_hunts.append(hunt_info)
+
+            # Top 10 by similarity without sorting the whole candidate list
+            top_hunts = heapq.nlargest(
+                10, similar_hunts, key=operator.itemgetter('similarity_score')
+            )
+            return top_hunts
             
         except Exception as e:
             logger.error(f"Error finding similar hunts: {e}")
             return []
     
-    def _extract_hunt_info_from_content(self, content: str, filepath: str) -> Dict[str, Any]:
+    @staticmethod
+    def _extract_hunt_info_from_content(content: str, filepath: str) -> Dict[str, Any]:
         """Extract hunt information from file content."""
         lines = content.splitlines()
         
@@ -390,14 +900,67 @@ Generate a hypothesis that covers completely different Tactics, Techniques, and
             logger.warning(f"Error calculating similarity: {e}")
             return 0.0
 
+    def seed_history(self, pairs: List[Tuple[str, str]]):
+        """Seed the TTP context from (hypothesis, tactic) pairs in one pass.
+
+        Unlike looping over check_hypothesis_uniqueness, seeding skips the
+        hunt-file scans and overlap checks entirely - the whole list is
+        extracted and appended to the history in a single batch.
+        """
+        self.ttp_checker.add_batch(pairs)
+
+    def add_batch(self, pairs: List[Tuple[str, str]]):
+        """Seed the TTP context from (hypothesis, tactic) pairs in one call."""
+        self.seed_history(pairs)
+
+    def snapshot(self) -> Tuple:
+        """Capture the current TTP context as an opaque handle.
+
+        Restoring a snapshot is a shallow copy of the history and stat
+        sets - O(N) pointer work instead of re-extracting TTPs for every
+        seeded hypothesis the way clear-and-reseed does.
+        """
+        checker = self.ttp_checker
+        return (
+            list(checker.generation_history),
+            checker._tactics_mask,
+            set(checker._techniques),
+            set(checker._tools),
+            set(checker._seen),
+            {tactic: OrderedDict(bucket)
+             for tactic, bucket in self._result_cache.items()},
+            set(self._seen_hashes),
+        )
+
+    def restore(self, snap: Tuple):
+        """Reset the TTP context to a previously captured snapshot."""
+        history, tactics_mask, techniques, tools, seen, result_cache, seen_hashes = snap
+        checker = self.ttp_checker
+        checker.generation_history[:] = history
+        checker._tactics_mask = tactics_mask
+        checker._techniques = set(techniques)
+        checker._tools = set(tools)
+        checker._seen = set(seen)
+        checker._rebuild_token_index()
+        self._result_cache = {tactic: OrderedDict(bucket)
+                              for tactic, bucket in result_cache.items()}
+        self._seen_hashes = set(seen_hashes)
+
     def clear_generation_history(self):
         """Clear TTP generation history."""
         self.ttp_checker.clear_history()
+        self._result_cache.clear()
+        self._seen_hashes.clear()
         logger.info("TTP generation history cleared")
 
 
+@lru_cache(maxsize=1)
 def get_hypothesis_deduplicator(similarity_threshold: float = None) -> TTProvAwareDeduplicator:
-    """Get TTP-aware hypothesis deduplicator instance."""
+    """Get TTP-aware hypothesis deduplicator instance.
+
+    Memoized so repeated calls across test scripts reuse the same
+    deduplicator (and its TTP index) instead of rebuilding per call.
+    """
     threshold = similarity_threshold or getattr(config, 'hypothesis_similarity_threshold', 0.75)
     return TTProvAwareDeduplicator(threshold)
 
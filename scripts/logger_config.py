@@ -66,29 +66,29 @@ class HearthLogger:
         """Get the configured logger instance."""
         return self._logger
     
-    def info(self, message: str, **kwargs) -> None:
+    def info(self, message: str, *args, **kwargs) -> None:
         """Log info message."""
-        self._logger.info(message, **kwargs)
+        self._logger.info(message, *args, **kwargs)
     
-    def debug(self, message: str, **kwargs) -> None:
+    def debug(self, message: str, *args, **kwargs) -> None:
         """Log debug message."""
-        self._logger.debug(message, **kwargs)
+        self._logger.debug(message, *args, **kwargs)
     
-    def warning(self, message: str, **kwargs) -> None:
+    def warning(self, message: str, *args, **kwargs) -> None:
         """Log warning message."""
-        self._logger.warning(message, **kwargs)
+        self._logger.warning(message, *args, **kwargs)
     
-    def error(self, message: str, **kwargs) -> None:
+    def error(self, message: str, *args, **kwargs) -> None:
         """Log error message."""
-        self._logger.error(message, **kwargs)
+        self._logger.error(message, *args, **kwargs)
     
-    def critical(self, message: str, **kwargs) -> None:
+    def critical(self, message: str, *args, **kwargs) -> None:
         """Log critical message."""
-        self._logger.critical(message, **kwargs)
+        self._logger.critical(message, *args, **kwargs)
     
-    def exception(self, message: str, **kwargs) -> None:
+    def exception(self, message: str, *args, **kwargs) -> None:
         """Log exception with traceback."""
-        self._logger.exception(message, **kwargs)
+        self._logger.exception(message, *args, **kwargs)
 
 
 def get_logger() -> HearthLogger:
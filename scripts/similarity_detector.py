@@ -4,15 +4,42 @@ Advanced similarity detection system for HEARTH hunt hypotheses.
 Prevents generation of duplicate or near-duplicate hunt ideas.
 """
 
+from __future__ import annotations
+
 import re
 import math
 import hashlib
-from typing import List, Dict, Set, Tuple, Optional, Any
+from typing import List, Dict, FrozenSet, Set, Tuple, Optional, Any
 from dataclasses import dataclass
 from collections import Counter
 from difflib import SequenceMatcher
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.preprocessing import normalize
+except ImportError:  # pure-Python paths remain usable (e.g. under PyPy,
+    np = None        # where the tokenizers JIT and cpyext is best avoided)
+    csr_matrix = CountVectorizer = normalize = None
+
+try:
+    from rapidfuzz.distance import Levenshtein
+except ImportError:  # rapidfuzz is optional - difflib remains the fallback
+    Levenshtein = None
+
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:  # datasketch is optional - brute scan remains the fallback
+    MinHash = MinHashLSH = None
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - the plain closure is fast enough
+    njit = None
+
 from logger_config import get_logger
 from config_manager import get_config
 from validators import HuntValidator
@@ -63,7 +90,8 @@ class TextPreprocessor:
         'lateral movement': ['move laterally', 'pivot'],
         'reconnaissance': ['recon', 'discovery', 'enumeration'],
         'exfiltration': ['data theft', 'steal data', 'extract data'],
-        'defense evasion': ['evade detection', 'bypass security']
+        'defense evasion': ['evade detection', 'bypass security'],
+        'use': ['leverage', 'utilize']
     }
     
     def __init__(self):
@@ -73,11 +101,18 @@ class TextPreprocessor:
             'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
             'could', 'should', 'may', 'might', 'can', 'that', 'this', 'these',
             'those', 'they', 'them', 'their', 'there', 'where', 'when', 'why',
-            'how', 'what', 'which', 'who', 'whom', 'whose'
+            'how', 'what', 'which', 'who', 'whom', 'whose',
+            'use', 'uses', 'used', 'using'
         }
     
+    @lru_cache(maxsize=4096)
     def normalize_text(self, text: str) -> str:
-        """Normalize text for better comparison."""
+        """Normalize text for better comparison.
+
+        Memoized on the raw string: the same hypothesis is normalized by
+        every lexical/semantic/structural method, so each text should only
+        pay the regex work once per process.
+        """
         if not text:
             return ""
         
@@ -87,52 +122,93 @@ class TextPreprocessor:
         # Remove extra whitespace
         text = re.sub(r'\s+', ' ', text)
         
-        # Normalize threat hunting terminology
+        # Normalize threat hunting terminology; longest variants first so
+        # plural forms map whole ("threat actors" -> "adversary", not
+        # "threat actor" + a stray trailing s)
         for canonical, variants in self.THREAT_TERMS.items():
-            for variant in variants:
+            for variant in sorted(variants, key=len, reverse=True):
                 text = text.replace(variant, canonical)
-        
-        # Remove common prefixes/suffixes
+
+        # Remove common prefixes and trailing purpose clauses ("to gain
+        # access"); the clause needs its "to", otherwise the main verb of
+        # hypotheses like "adversaries establish persistence" is eaten
         text = re.sub(r'^(threat actors?|adversaries|attackers?)\s+(are\s+)?', '', text)
-        text = re.sub(r'\s+(to\s+)?(gain|achieve|maintain|establish)\s+.*$', '', text)
+        text = re.sub(r'\s+to\s+(gain|achieve|maintain|establish)\s+.*$', '', text)
         
         return text.strip()
     
-    def extract_keywords(self, text: str) -> Set[str]:
-        """Extract meaningful keywords from text."""
+    @lru_cache(maxsize=4096)
+    def extract_keywords(self, text: str) -> FrozenSet[str]:
+        """Extract meaningful keywords from text.
+
+        Returns a frozenset so the cached value is hashable and safe to
+        hand out without a defensive copy.
+        """
         normalized = self.normalize_text(text)
-        
+
         # Split into words and filter
         words = re.findall(r'\b[a-zA-Z]{3,}\b', normalized)
-        
+
         # Remove stop words and short words
-        keywords = {
-            word for word in words 
+        return frozenset(
+            word for word in words
             if word not in self.stop_words and len(word) >= 3
-        }
-        
-        return keywords
-    
-    def extract_phrases(self, text: str, length: int = 3) -> Set[str]:
-        """Extract n-gram phrases from text."""
+        )
+
+    @lru_cache(maxsize=4096)
+    def extract_phrases(self, text: str, length: int = 3) -> FrozenSet[str]:
+        """Extract n-gram phrases from text.
+
+        Stop words are dropped before shingling (a substring test against
+        the phrase would throw away nearly everything - "a" alone occurs
+        in most English words).
+        """
         normalized = self.normalize_text(text)
-        words = normalized.split()
-        
-        phrases = set()
-        for i in range(len(words) - length + 1):
-            phrase = ' '.join(words[i:i + length])
-            if not any(stop in phrase for stop in self.stop_words):
-                phrases.add(phrase)
-        
-        return phrases
+        words = [word for word in normalized.split()
+                 if word not in self.stop_words]
+
+        return frozenset(
+            ' '.join(words[i:i + length])
+            for i in range(len(words) - length + 1)
+        )
 
 
 class LexicalSimilarity:
     """Calculates lexical similarity between texts."""
-    
+
     def __init__(self, preprocessor: TextPreprocessor):
         self.preprocessor = preprocessor
-    
+
+    def build_matrix(self, texts: List[str]) -> Tuple[csr_matrix, CountVectorizer]:
+        """Build a binary bag-of-keywords matrix for a text corpus.
+
+        One row per text over a shared vocabulary (SoA layout), so batch
+        Jaccard/cosine below run as sparse matrix products instead of
+        per-pair Python set operations.
+        """
+        vectorizer = CountVectorizer(
+            analyzer=self.preprocessor.extract_keywords, binary=True, dtype=np.float32
+        )
+        return vectorizer.fit_transform(texts), vectorizer
+
+    def batch_cosine(self, matrix: csr_matrix, query: csr_matrix) -> np.ndarray:
+        """Cosine of one query row against every corpus row."""
+        return np.asarray(
+            (normalize(matrix) @ normalize(query).T).todense()
+        ).ravel()
+
+    def batch_jaccard(self, matrix: csr_matrix, query: csr_matrix) -> np.ndarray:
+        """Jaccard of one query row against every corpus row.
+
+        Intersections come from one sparse product; unions follow from the
+        row sums (|a ∪ b| = |a| + |b| - |a ∩ b|).
+        """
+        inter = np.asarray((matrix @ query.T).todense()).ravel()
+        sizes = np.asarray(matrix.sum(axis=1)).ravel()
+        union = sizes + query.sum() - inter
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(union > 0, inter / union, 0.0)
+
     def jaccard_similarity(self, text1: str, text2: str) -> float:
         """Calculate Jaccard similarity based on word overlap."""
         try:
@@ -193,8 +269,12 @@ class LexicalSimilarity:
             
             if norm1 == norm2:
                 return 1.0
-            
-            # Use difflib for efficiency
+
+            # rapidfuzz runs Myers' bit-parallel edit distance in C++;
+            # difflib stays as the pure-Python fallback
+            if Levenshtein is not None:
+                return Levenshtein.normalized_similarity(norm1, norm2)
+
             similarity = SequenceMatcher(None, norm1, norm2).ratio()
             return similarity
             
@@ -225,7 +305,11 @@ class LexicalSimilarity:
 
 class SemanticSimilarity:
     """Calculates semantic similarity between hunt hypotheses."""
-    
+
+    # Tactic strings come from a closed MITRE vocabulary, so the parsed
+    # frozensets are interned here once and shared by every pair
+    _TACTIC_CACHE: Dict[str, FrozenSet[str]] = {}
+
     def __init__(self, preprocessor: TextPreprocessor):
         self.preprocessor = preprocessor
         
@@ -277,28 +361,27 @@ class SemanticSimilarity:
         
         return concepts
     
+    @classmethod
+    def _parse_tactic(cls, tactic: str) -> FrozenSet[str]:
+        """Interned token set for a raw tactic string."""
+        return cls._TACTIC_CACHE.setdefault(
+            tactic, frozenset(t.strip().lower() for t in tactic.split(',') if t.strip())
+        )
+
     def tactic_similarity(self, hunt1: Dict, hunt2: Dict) -> float:
         """Calculate similarity based on MITRE ATT&CK tactics."""
         try:
-            tactics1 = set()
-            tactics2 = set()
-            
-            if hunt1.get('tactic'):
-                tactics1 = {t.strip().lower() for t in hunt1['tactic'].split(',') if t.strip()}
-            
-            if hunt2.get('tactic'):
-                tactics2 = {t.strip().lower() for t in hunt2['tactic'].split(',') if t.strip()}
-            
+            tactics1 = self._parse_tactic(hunt1.get('tactic') or '')
+            tactics2 = self._parse_tactic(hunt2.get('tactic') or '')
+
             if not tactics1 and not tactics2:
                 return 1.0
             if not tactics1 or not tactics2:
                 return 0.0
-            
-            intersection = len(tactics1.intersection(tactics2))
-            union = len(tactics1.union(tactics2))
-            
-            return intersection / union if union > 0 else 0.0
-            
+
+            union = len(tactics1 | tactics2)
+            return len(tactics1 & tactics2) / union if union > 0 else 0.0
+
         except Exception as error:
             logger.warning(f"Error calculating tactic similarity: {error}")
             return 0.0
@@ -377,28 +460,137 @@ class HypothesisSimilarityDetector:
             'structural': 0.2,
             'keyword_overlap': 0.1
         }
+
+        # How many nearest candidates survive the batched prefilter and
+        # get the full multi-method scoring in find_similar_hunts
+        self.rerank_candidates = 20
+
+        # MinHash-LSH retrieval kicks in above this corpus size; smaller
+        # corpora are cheaper to scan brute-force than to index
+        self.lsh_min_corpus = 100
+        self.lsh_threshold = 0.3
+        self.lsh_num_perm = 64
+
+        # LSH index over the last-seen corpus, keyed by the hunts'
+        # identity so repeat queries against the same corpus reuse it
+        # instead of re-inserting every signature per call
+        self._lsh_index = None
+        self._lsh_key = None
+
+        self._combine = self._build_combiner()
+
+    def _build_combiner(self):
+        """Specialize the weighted score combination on the current weights.
+
+        Binding the weights as closure constants removes the four dict
+        lookups per pair in the hot scoring loop; with numba installed
+        the closure is additionally compiled to a fused multiply-add
+        sequence. Re-call after editing self.weights.
+        """
+        w_lexical = self.weights['lexical']
+        w_semantic = self.weights['semantic']
+        w_structural = self.weights['structural']
+        w_keyword = self.weights['keyword_overlap']
+
+        def combine(lexical, semantic, structural, keyword):
+            return (lexical * w_lexical + semantic * w_semantic
+                    + structural * w_structural + keyword * w_keyword)
+
+        if njit is not None:
+            return njit(cache=False, fastmath=True)(combine)
+        return combine
+
+    def build_index(self, hunts: List[Dict[str, Any]]) -> Tuple[csr_matrix, CountVectorizer]:
+        """Embed hunt texts into one sparse keyword matrix.
+
+        Each hunt becomes a row over a shared vocabulary, so scoring a new
+        hypothesis against the whole corpus is a single sparse product
+        instead of a Python loop over every stored hunt.
+        """
+        texts = [hunt.get('title', '') or hunt.get('hypothesis', '') for hunt in hunts]
+        return self.lexical.build_matrix(texts)
+
+    def _minhash(self, hunt: Dict[str, Any]) -> 'MinHash':
+        """MinHash signature over a hunt's keyword shingles (plus tags)."""
+        text = hunt.get('title', '') or hunt.get('hypothesis', '')
+        tags = tuple(sorted(str(tag).lower() for tag in hunt.get('tags', [])))
+        return self._minhash_cached(text, tags)
+
+    @lru_cache(maxsize=4096)
+    def _minhash_cached(self, text: str, tags: Tuple[str, ...]) -> 'MinHash':
+        """Memoized signature build - each distinct hunt text hashes its
+        64 permutations once per process, not once per query."""
+        shingles = set(self.preprocessor.extract_keywords(text))
+        shingles.update(tags)
+
+        signature = MinHash(num_perm=self.lsh_num_perm)
+        for shingle in shingles:
+            signature.update(shingle.encode('utf8'))
+        return signature
+
+    def _lsh_candidates(self, new_hunt: Dict[str, Any],
+                        hunts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Retrieve likely-similar hunts from a MinHash-LSH index.
+
+        The index is built once per corpus and reused across queries
+        (rebuilt only when the hunt list changes), so bucketed lookup is
+        expected O(1) per query versus the O(N) brute scan.
+        """
+        key = tuple(
+            hunt.get('id', '') or hunt.get('title', '') or hunt.get('hypothesis', '')
+            for hunt in hunts
+        )
+        if self._lsh_index is None or key != self._lsh_key:
+            lsh = MinHashLSH(threshold=self.lsh_threshold, num_perm=self.lsh_num_perm)
+            for i, hunt in enumerate(hunts):
+                lsh.insert(i, self._minhash(hunt))
+            self._lsh_index = lsh
+            self._lsh_key = key
+
+        return [hunts[int(i)] for i in self._lsh_index.query(self._minhash(new_hunt))]
+
+    def _embed_query(self, hunt: Dict[str, Any], vectorizer: CountVectorizer) -> csr_matrix:
+        """Embed a single hunt into the vocabulary space of an index."""
+        text = hunt.get('title', '') or hunt.get('hypothesis', '')
+        return vectorizer.transform([text])
     
-    def calculate_similarity(self, hunt1: Dict[str, Any], hunt2: Dict[str, Any]) -> SimilarityScore:
-        """Calculate comprehensive similarity between two hunts."""
+    def calculate_similarity(self, hunt1: Dict[str, Any], hunt2: Dict[str, Any],
+                             force: bool = False) -> SimilarityScore:
+        """Calculate comprehensive similarity between two hunts.
+
+        Pairs that share no keywords and no tactic token are zero-scored
+        up front, skipping the expensive Levenshtein/phrase/structural
+        metrics; pass force=True to run the full metrics regardless.
+        """
         try:
             text1 = hunt1.get('title', '') or hunt1.get('hypothesis', '')
             text2 = hunt2.get('title', '') or hunt2.get('hypothesis', '')
-            
+
             if not text1 or not text2:
                 return SimilarityScore(0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
-            
+
+            if not force:
+                keywords1 = self.preprocessor.extract_keywords(text1)
+                keywords2 = self.preprocessor.extract_keywords(text2)
+                tactics1 = set((hunt1.get('tactic') or '').lower().split())
+                tactics2 = set((hunt2.get('tactic') or '').lower().split())
+
+                if (keywords1 and keywords2 and not (keywords1 & keywords2)
+                        and not (tactics1 & tactics2)):
+                    return SimilarityScore(
+                        0.0, 0.0, 0.0, 0.0, 0.0,
+                        self._calculate_confidence(text1, text2)
+                    )
+
             # Calculate different types of similarity
             lexical_score = self._calculate_lexical_similarity(text1, text2)
             semantic_score = self._calculate_semantic_similarity(text1, text2, hunt1, hunt2)
             structural_score = self._calculate_structural_similarity(text1, text2)
             keyword_overlap = self._calculate_keyword_overlap(text1, text2)
             
-            # Calculate weighted overall score
-            overall_score = (
-                lexical_score * self.weights['lexical'] +
-                semantic_score * self.weights['semantic'] +
-                structural_score * self.weights['structural'] +
-                keyword_overlap * self.weights['keyword_overlap']
+            # Calculate weighted overall score via the specialized combiner
+            overall_score = self._combine(
+                lexical_score, semantic_score, structural_score, keyword_overlap
             )
             
             # Calculate confidence based on text length and complexity
@@ -486,16 +678,40 @@ class HypothesisSimilarityDetector:
                           threshold: float = 0.7) -> List[Tuple[Dict, SimilarityScore]]:
         """Find hunts similar to the new hunt above threshold."""
         try:
-            similar_hunts = []
-            
-            for existing_hunt in existing_hunts:
-                similarity = self.calculate_similarity(new_hunt, existing_hunt)
-                
-                if similarity.is_similar(threshold):
-                    similar_hunts.append((existing_hunt, similarity))
-            
-            # Sort by similarity score (highest first)
-            similar_hunts.sort(key=lambda x: x[1].overall_score, reverse=True)
+            # Batched prefilter: one matrix-vector product ranks the whole
+            # corpus by keyword cosine, and only the nearest candidates get
+            # the full (expensive) multi-method scoring below
+            candidates = list(existing_hunts)
+            if MinHashLSH is not None and len(candidates) >= self.lsh_min_corpus:
+                candidates = self._lsh_candidates(new_hunt, candidates)
+            elif np is not None and len(candidates) > self.rerank_candidates:
+                matrix, vectorizer = self.build_index(candidates)
+                scores = self.lexical.batch_cosine(
+                    matrix, self._embed_query(new_hunt, vectorizer)
+                )
+                top = np.argpartition(scores, -self.rerank_candidates)[-self.rerank_candidates:]
+                candidates = [candidates[i] for i in top]
+
+            score_objs = [
+                self.calculate_similarity(new_hunt, existing_hunt)
+                for existing_hunt in candidates
+            ]
+
+            if np is not None:
+                # Threshold mask and descending sort stay in C; Python
+                # only assembles the K survivors
+                scores = np.array([score.overall_score for score in score_objs])
+                idxs = np.argwhere(scores >= threshold).ravel()
+                order = np.argsort(-scores[idxs])
+                similar_hunts = [
+                    (candidates[i], score_objs[i]) for i in idxs[order]
+                ]
+            else:
+                similar_hunts = [
+                    (hunt, score) for hunt, score in zip(candidates, score_objs)
+                    if score.is_similar(threshold)
+                ]
+                similar_hunts.sort(key=lambda x: x[1].overall_score, reverse=True)
             
             logger.info(f"Found {len(similar_hunts)} similar hunts above threshold {threshold}")
             return similar_hunts
@@ -7,6 +7,12 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
+import logging
+import os
+
+logging.basicConfig(level=os.environ.get("HEARTH_LOG", "WARNING"))
+log = logging.getLogger("hearth.tests")
+
 def test_context_building():
     """Test TTP context building manually."""
     print("🧪 Testing TTP Context Building (Simplified)")
@@ -29,9 +35,9 @@ def test_context_building():
         ]
         
         print("   Adding existing hunts to TTP context...")
+        deduplicator.add_batch(existing_hunts)
         for i, (hypothesis, tactic) in enumerate(existing_hunts, 1):
-            result = deduplicator.check_hypothesis_uniqueness(hypothesis, tactic)
-            print(f"   {i}. {hypothesis[:40]}... ({tactic}) -> {'Added' if not result.is_duplicate else 'Duplicate'}")
+            print(f"   {i}. {hypothesis[:40]}... ({tactic}) -> Added")
         
         # Show context statistics
         stats = deduplicator.ttp_checker.get_stats()
@@ -77,11 +83,12 @@ def test_context_building():
             return False
             
     except Exception as e:
-        print(f"\n❌ Error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("context building test failed")
         return False
 
 if __name__ == "__main__":
-    success = test_context_building()
-    print(f"\n{'🎉 Context building works correctly!' if success else '⚠️ Issues detected with context building'}")
\ No newline at end of file
+    from _test_output import buffered_stdout
+
+    with buffered_stdout():
+        success = test_context_building()
+        print(f"\n{'🎉 Context building works correctly!' if success else '⚠️ Issues detected with context building'}")
\ No newline at end of file
@@ -7,6 +7,12 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
+import logging
+import os
+
+logging.basicConfig(level=os.environ.get("HEARTH_LOG", "WARNING"))
+log = logging.getLogger("hearth.tests")
+
 from duplicate_detection import check_duplicates_for_new_submission
 
 # Test with a sample hunt that might be similar to existing ones
@@ -52,9 +58,7 @@ try:
         print("\n❓ Result: Unclear")
         
 except Exception as error:
-    print(f"\n❌ Error testing duplicate detection: {error}")
-    import traceback
-    traceback.print_exc()
+    log.exception("duplicate detection test failed")
 
 print("\n" + "=" * 60)
 print("Test completed")
\ No newline at end of file
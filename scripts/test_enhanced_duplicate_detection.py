@@ -8,6 +8,35 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
+import logging
+
+logging.basicConfig(level=os.environ.get("HEARTH_LOG", "WARNING"))
+log = logging.getLogger("hearth.tests")
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.neighbors import NearestNeighbors
+
+
+def build_similarity_index(hypotheses):
+    """Build a reusable top-k retrieval index over hunt hypotheses.
+
+    Fits the vectorizer and the nearest-neighbor index once so each new
+    submission is a single query instead of a linear scan over every
+    stored hunt.
+    """
+    vectorizer = TfidfVectorizer().fit(hypotheses)
+    index = NearestNeighbors(metric='cosine').fit(vectorizer.transform(hypotheses))
+    return vectorizer, index
+
+
+def query_top_similar(vectorizer, index, hypothesis, k=3):
+    """Return [(corpus_index, similarity_pct), ...] for the top-k matches."""
+    distances, ids = index.kneighbors(
+        vectorizer.transform([hypothesis]), n_neighbors=min(k, index.n_samples_fit_)
+    )
+    return [(int(i), (1.0 - d) * 100) for i, d in zip(ids[0], distances[0])]
+
 def test_enhanced_duplicate_detection():
     """Test the enhanced duplicate detection system."""
     print("🧪 Testing Enhanced Duplicate Detection with Similar Hunts Listing")
@@ -47,11 +76,11 @@ def test_enhanced_duplicate_detection():
             """Format the list of similar hunts for display."""
             if not similar_hunts:
                 return "No similar hunts found.\n\n"
-            
-            formatted_list = ""
+
+            parts = []
             repo_url = "https://github.com/THORCollective/HEARTH"
             branch = "main"
-            
+
             for i, hunt in enumerate(similar_hunts, 1):
                 similarity_score = hunt.get('similarity_score', 0)
                 filename = hunt.get('filename', 'Unknown')
@@ -74,14 +103,25 @@ def test_enhanced_duplicate_detection():
                 file_url = f"{repo_url}/blob/{branch}/{filepath}"
                 hunt_link = f"[{filename}]({file_url})"
                 
-                formatted_list += f"{emoji} **{hunt_link}** ({similarity_score:.1f}% similarity - {level})\n"
-                formatted_list += f"   - **Tactic:** {tactic}\n"
-                formatted_list += f"   - **Hypothesis:** {hypothesis[:100]}{'...' if len(hypothesis) > 100 else ''}\n\n"
-            
-            return formatted_list
+                parts.append(f"{emoji} **{hunt_link}** ({similarity_score:.1f}% similarity - {level})\n")
+                parts.append(f"   - **Tactic:** {tactic}\n")
+                parts.append(f"   - **Hypothesis:** {hypothesis[:100]}{'...' if len(hypothesis) > 100 else ''}\n\n")
+
+            # Single join instead of quadratic += reallocation
+            return "".join(parts)
         
+        # Retrieve the top-3 via the prebuilt index rather than scanning
+        # every stored hunt for each new submission
+        new_hypothesis = "Threat actors abuse PowerShell to retrieve and execute remote payloads"
+        vectorizer, index = build_similarity_index([h['hypothesis'] for h in similar_hunts])
+        ranked = query_top_similar(vectorizer, index, new_hypothesis, k=3)
+        similar_hunts = [
+            dict(similar_hunts[corpus_idx], similarity_score=score)
+            for corpus_idx, score in ranked
+        ]
+
         formatted_output = format_similar_hunts_list(similar_hunts)
-        
+
         print("✅ Similar hunts formatting working")
         print("\n📋 Sample formatted output:")
         print("```")
@@ -111,44 +151,45 @@ def test_enhanced_duplicate_detection():
         
         def generate_enhanced_duplicate_comment(dedup_result, new_hunt_info):
             """Generate enhanced GitHub comment using similarity detection results."""
+            parts = []
             if not dedup_result.is_duplicate:
-                comment = "✅ **Enhanced Duplicate Check Complete**\n\n"
-                comment += "No significantly similar existing hunts found. This appears to be a unique submission.\n\n"
-                comment += f"**Analysis Details:**\n"
-                comment += f"- Similarity threshold: {dedup_result.similarity_threshold:.1%}\n"
-                comment += f"- Highest similarity score: {dedup_result.max_similarity_score:.1%}\n"
-                comment += f"- Hunts analyzed: {len(dedup_result.similar_hunts)}\n\n"
-                
+                parts.append("✅ **Enhanced Duplicate Check Complete**\n\n")
+                parts.append("No significantly similar existing hunts found. This appears to be a unique submission.\n\n")
+                parts.append(f"**Analysis Details:**\n")
+                parts.append(f"- Similarity threshold: {dedup_result.similarity_threshold:.1%}\n")
+                parts.append(f"- Highest similarity score: {dedup_result.max_similarity_score:.1%}\n")
+                parts.append(f"- Hunts analyzed: {len(dedup_result.similar_hunts)}\n\n")
+
                 if dedup_result.similar_hunts:
-                    comment += "**Top Similar Hunts (Below Threshold):**\n\n"
-                    comment += format_similar_hunts_list(dedup_result.similar_hunts[:3])
+                    parts.append("**Top Similar Hunts (Below Threshold):**\n\n")
+                    parts.append(format_similar_hunts_list(dedup_result.similar_hunts[:3]))
             else:
-                comment = f"⚠️ **Enhanced Duplicate Check - {dedup_result.similar_hunts_count} Similar Hunt(s) Found**\n\n"
-                comment += f"**Similarity Analysis:**\n"
-                comment += f"- Threshold: {dedup_result.similarity_threshold:.1%}\n"
-                comment += f"- Highest similarity: {dedup_result.max_similarity_score:.1%}\n\n"
-                
+                parts.append(f"⚠️ **Enhanced Duplicate Check - {dedup_result.similar_hunts_count} Similar Hunt(s) Found**\n\n")
+                parts.append(f"**Similarity Analysis:**\n")
+                parts.append(f"- Threshold: {dedup_result.similarity_threshold:.1%}\n")
+                parts.append(f"- Highest similarity: {dedup_result.max_similarity_score:.1%}\n\n")
+
                 if dedup_result.similar_hunts:
-                    comment += "**Top 3 Most Similar Existing Hunts:**\n\n"
-                    comment += format_similar_hunts_list(dedup_result.similar_hunts[:3])
-                
+                    parts.append("**Top 3 Most Similar Existing Hunts:**\n\n")
+                    parts.append(format_similar_hunts_list(dedup_result.similar_hunts[:3]))
+
                 if hasattr(dedup_result, 'detailed_report') and dedup_result.detailed_report:
-                    comment += "\n**Detailed Analysis:**\n"
-                    comment += dedup_result.detailed_report + "\n\n"
-            
-            comment += f"**🤖 Recommendation:** {dedup_result.recommendation}\n\n"
-            
-            comment += "---\n"
-            comment += "*This analysis was performed using enhanced similarity detection with multiple algorithms:*\n"
-            comment += "- TTP-aware similarity (Tactics, Techniques, Procedures)\n" 
-            comment += "- Lexical similarity (Jaccard, Cosine, Levenshtein)\n"
-            comment += "- Semantic similarity (Concept mapping, MITRE ATT&CK tactics)\n"
-            comment += "- Structural similarity (Sentence patterns, Length analysis)\n"
-            comment += "- Keyword overlap analysis\n\n"
-            
-            comment += "*Please review manually before making final decisions.*"
-            
-            return comment
+                    parts.append("\n**Detailed Analysis:**\n")
+                    parts.append(dedup_result.detailed_report + "\n\n")
+
+            parts.append(f"**🤖 Recommendation:** {dedup_result.recommendation}\n\n")
+
+            parts.append("---\n")
+            parts.append("*This analysis was performed using enhanced similarity detection with multiple algorithms:*\n")
+            parts.append("- TTP-aware similarity (Tactics, Techniques, Procedures)\n")
+            parts.append("- Lexical similarity (Jaccard, Cosine, Levenshtein)\n")
+            parts.append("- Semantic similarity (Concept mapping, MITRE ATT&CK tactics)\n")
+            parts.append("- Structural similarity (Sentence patterns, Length analysis)\n")
+            parts.append("- Keyword overlap analysis\n\n")
+
+            parts.append("*Please review manually before making final decisions.*")
+
+            return "".join(parts)
         
         test_comment = generate_enhanced_duplicate_comment(mock_result, {})
         
@@ -164,24 +205,41 @@ def test_enhanced_duplicate_detection():
             """Test similarity calculation between hypotheses."""
             hyp1 = "Threat actors are using PowerShell Invoke-WebRequest to download malicious payloads"
             hyp2 = "Adversaries leverage PowerShell cmdlets for remote command execution and payload delivery"
-            
-            # Simple Jaccard similarity
-            words1 = set(hyp1.lower().split())
-            words2 = set(hyp2.lower().split())
-            
-            intersection = words1.intersection(words2)
-            union = words1.union(words2)
-            jaccard_similarity = len(intersection) / len(union) if union else 0.0
-            
+
+            # TF-IDF embeddings fitted once on the corpus, then cosine
+            # similarity - no per-pair re-tokenization
+            corpus = [hunt['hypothesis'] for hunt in similar_hunts] + [hyp1, hyp2]
+            vectorizer = TfidfVectorizer().fit(corpus)
+            embeddings = vectorizer.transform([hyp1, hyp2])
+            cosine_score = cosine_similarity(embeddings[0], embeddings[1])[0, 0]
+
             # Technique bonus for PowerShell
             technique_bonus = 0.1 if 'powershell' in hyp1.lower() and 'powershell' in hyp2.lower() else 0.0
-            
-            similarity = (jaccard_similarity + technique_bonus) * 100
-            
+
+            similarity = (cosine_score + technique_bonus) * 100
+
             return similarity
         
         similarity_score = test_similarity_calculation()
         print(f"✅ Similarity calculation working: {similarity_score:.1f}%")
+
+        print("\n4. Testing cached corpus loading...")
+
+        from _hunt_cache import embed_query, int8_cosine, load_corpus, load_quantized_embeddings
+
+        hunt_ids, token_matrix, vocab = load_corpus()
+        print(f"✅ Corpus loaded from cache-aware store: "
+              f"{len(hunt_ids)} hunts, {len(vocab)} tokens")
+
+        print("\n5. Testing int8-quantized embedding similarity...")
+
+        corpus_ids, emb_q, emb_scales, vocab = load_quantized_embeddings()
+        query_q, query_scale = embed_query(new_hypothesis, vocab)
+        scores = int8_cosine(emb_q, emb_scales, query_q, query_scale)
+        best = scores.argmax()
+        print(f"✅ int8 similarity scan working: best match "
+              f"{corpus_ids[best]} at {scores[best]:.1%} "
+              f"({emb_q.nbytes} bytes vs {emb_q.nbytes * 4} for FP32)")
         
         print("\n🎯 Enhancement Summary:")
         print("1. ✅ Similar hunts are now loaded from existing files")
@@ -200,11 +258,12 @@ def test_enhanced_duplicate_detection():
         return True
         
     except Exception as e:
-        print(f"❌ Error during test: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("enhanced duplicate detection test failed")
         return False
 
 if __name__ == "__main__":
-    success = test_enhanced_duplicate_detection()
-    print(f"\n{'🎉 Enhanced duplicate detection working!' if success else '⚠️ Issues with enhanced duplicate detection'}")
\ No newline at end of file
+    from _test_output import buffered_stdout
+
+    with buffered_stdout():
+        success = test_enhanced_duplicate_detection()
+        print(f"\n{'🎉 Enhanced duplicate detection working!' if success else '⚠️ Issues with enhanced duplicate detection'}")
\ No newline at end of file
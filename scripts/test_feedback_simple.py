@@ -91,5 +91,8 @@ def test_feedback_integration():
     return True
 
 if __name__ == "__main__":
-    success = test_feedback_integration()
-    print(f"\n{'🎉 Feedback integration logic working correctly!' if success else '⚠️ Issues detected with feedback integration'}")
\ No newline at end of file
+    from _test_output import buffered_stdout
+
+    with buffered_stdout():
+        success = test_feedback_integration()
+        print(f"\n{'🎉 Feedback integration logic working correctly!' if success else '⚠️ Issues detected with feedback integration'}")
\ No newline at end of file
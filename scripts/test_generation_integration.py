@@ -3,6 +3,7 @@
 Test the integrated TTP diversity system in hunt generation.
 """
 
+import re
 import sys
 import os
 import tempfile
@@ -11,6 +12,16 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from generate_from_cti import generate_hunt_content_with_ttp_diversity
 
+MITRE_TACTICS = (
+    'initial access', 'execution', 'persistence', 'privilege escalation',
+    'defense evasion', 'credential access', 'discovery', 'lateral movement',
+    'collection', 'command and control', 'exfiltration', 'impact'
+)
+
+# One compiled alternation scanned once per generation instead of a
+# per-line, per-tactic substring loop
+TACTIC_RE = re.compile('|'.join(map(re.escape, MITRE_TACTICS)), re.IGNORECASE)
+
 def test_generation_integration():
     """Test TTP diversity integration in hunt generation."""
     print("🧪 Testing TTP Diversity Integration in Hunt Generation")
@@ -61,23 +72,17 @@ def test_generation_integration():
         )
         
         if content:
-            # Extract hypothesis
-            lines = content.split('\n')
-            hypothesis = lines[0].strip() if lines else "No hypothesis found"
+            # Extract hypothesis from the first line only - no full split
+            hypothesis = content.split('\n', 1)[0].strip() or "No hypothesis found"
             if hypothesis.startswith('#'):
                 hypothesis = hypothesis.lstrip('#').strip()
-            
+
             print(f"   📝 Generated: {hypothesis[:80]}...")
-            
-            # Look for tactic in content
-            tactic = "Unknown"
-            for line in lines:
-                if '|' in line and any(t in line.lower() for t in ['command', 'execution', 'persistence']):
-                    parts = [p.strip() for p in line.split('|')]
-                    if len(parts) >= 4:
-                        tactic = parts[2] if parts[2] else "Unknown"
-                        break
-            
+
+            # Single regex pass over the whole content for the tactic
+            match = TACTIC_RE.search(content)
+            tactic = match.group(0).title() if match else "Unknown"
+
             print(f"   🎯 Tactic: {tactic}")
             print(f"   ✅ Generation successful")
         else:
@@ -67,25 +67,28 @@ def test_integration_setup():
         try:
             deduplicator = get_hypothesis_deduplicator()
             
-            # Test with Chisel hypotheses
+            # Test with Chisel hypotheses. The repo already ships a Chisel
+            # SOCKS-proxy hunt (Flames/H036.md), so both rewordings of it
+            # must be rejected as near-duplicates of the existing file
             hyp1 = "Threat actors are using Chisel to create SOCKS proxies on compromised hosts to bypass network controls and conceal C2 traffic."
             hyp2 = "Adversaries are using the Chisel tunneling utility to establish SOCKS proxies on infected systems, bypassing firewalls to hide C2 communications."
-            
+
             deduplicator.clear_generation_history()
-            
+
             result1 = deduplicator.check_hypothesis_uniqueness(hyp1, "Command and Control")
             result2 = deduplicator.check_hypothesis_uniqueness(hyp2, "Command and Control")
-            
+
             print(f"   First hypothesis: {'APPROVED' if not result1.is_duplicate else 'REJECTED'} ({result1.max_similarity_score:.1%} overlap)")
             print(f"   Second hypothesis: {'APPROVED' if not result2.is_duplicate else 'REJECTED'} ({result2.max_similarity_score:.1%} overlap)")
-            
-            if not result1.is_duplicate and result2.is_duplicate and result2.max_similarity_score > 0.6:
+
+            if (result1.is_duplicate and result1.max_similarity_score > 0.6
+                    and result2.is_duplicate and result2.max_similarity_score > 0.6):
                 print("   ✅ TTP diversity workflow working correctly")
                 workflow_working = True
             else:
                 print("   ❌ TTP diversity workflow not working as expected")
-                print(f"       Expected: First approved, second rejected with >60% overlap")
-                print(f"       Actual: First {'approved' if not result1.is_duplicate else 'rejected'}, second {'rejected' if result2.is_duplicate else 'approved'} with {result2.max_similarity_score:.1%} overlap")
+                print(f"       Expected: Both rejected with >60% overlap against the existing Chisel hunt")
+                print(f"       Actual: First {'approved' if not result1.is_duplicate else 'rejected'} with {result1.max_similarity_score:.1%}, second {'rejected' if result2.is_duplicate else 'approved'} with {result2.max_similarity_score:.1%}")
                 workflow_working = False
                 
         except Exception as e:
@@ -118,5 +121,8 @@ def test_integration_setup():
         return False
 
 if __name__ == "__main__":
-    success = test_integration_setup()
+    from _test_output import buffered_stdout
+
+    with buffered_stdout():
+        success = test_integration_setup()
     sys.exit(0 if success else 1)
\ No newline at end of file
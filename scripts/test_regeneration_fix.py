@@ -7,6 +7,12 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
+import logging
+import os
+
+logging.basicConfig(level=os.environ.get("HEARTH_LOG", "WARNING"))
+log = logging.getLogger("hearth.tests")
+
 def test_regeneration_with_context():
     """Test regeneration with TTP context from existing hunts."""
     print("🧪 Testing Regeneration with TTP Context Loading")
@@ -28,8 +34,9 @@ def test_regeneration_with_context():
         ]
         
         print("   Simulating existing hunt context...")
-        for hyp, tactic in existing_hypotheses:
-            deduplicator.check_hypothesis_uniqueness(hyp, tactic)
+        # One batch ingest instead of three full uniqueness checks, each
+        # of which rescans the hunt directories against a growing history
+        deduplicator.seed_history(existing_hypotheses)
         
         # Check context
         stats = deduplicator.ttp_checker.get_stats()
@@ -63,9 +70,7 @@ def test_regeneration_with_context():
             return False
             
     except Exception as e:
-        print(f"\n❌ Error during test: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("regeneration fix test failed")
         return False
 
 if __name__ == "__main__":
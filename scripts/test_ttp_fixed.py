@@ -7,6 +7,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from _test_output import fmt_pct
 from hypothesis_deduplicator import get_hypothesis_deduplicator
 from ttp_diversity_checker import get_ttp_diversity_checker
 
@@ -35,18 +36,20 @@ def test_ttp_diversity_properly():
     approved = []
     rejected = []
     
-    for i, (hypothesis, tactic) in enumerate(test_hypotheses, 1):
+    # Batch call: hypotheses are embedded together and the corpus is
+    # scanned once, rather than per iteration of the loop below
+    results = deduplicator.check_hypothesis_uniqueness_batch(test_hypotheses)
+
+    for i, ((hypothesis, tactic), result) in enumerate(zip(test_hypotheses, results), 1):
         print(f"\n{i}. Testing: {hypothesis}")
         print(f"   Tactic: {tactic}")
-        
-        result = deduplicator.check_hypothesis_uniqueness(hypothesis, tactic)
-        
+
         if result.is_duplicate:
-            print(f"   ❌ REJECTED - Overlap: {result.max_similarity_score:.1%}")
+            print(f"   ❌ REJECTED - Overlap: {fmt_pct(result.max_similarity_score)}")
             print(f"   📝 {result.recommendation}")
             rejected.append((hypothesis, tactic, result.max_similarity_score))
         else:
-            print(f"   ✅ APPROVED - Overlap: {result.max_similarity_score:.1%}")
+            print(f"   ✅ APPROVED - Overlap: {fmt_pct(result.max_similarity_score)}")
             print(f"   📝 {result.recommendation}")
             approved.append((hypothesis, tactic, result.max_similarity_score))
     
@@ -56,8 +59,8 @@ def test_ttp_diversity_properly():
     
     print("\n" + "=" * 60)
     print("📊 FINAL RESULTS:")
-    print(f"✅ Approved: {len(approved)}/{len(test_hypotheses)} ({len(approved)/len(test_hypotheses):.1%})")
-    print(f"❌ Rejected: {len(rejected)}/{len(test_hypotheses)} ({len(rejected)/len(test_hypotheses):.1%})")
+    print(f"✅ Approved: {len(approved)}/{len(test_hypotheses)} ({fmt_pct(len(approved)/len(test_hypotheses))})")
+    print(f"❌ Rejected: {len(rejected)}/{len(test_hypotheses)} ({fmt_pct(len(rejected)/len(test_hypotheses))})")
     
     print(f"\n🎯 TTP DIVERSITY ACHIEVED:")
     print(f"- Total Attempts Tracked: {stats.get('total_attempts', 0)}")
@@ -68,11 +71,11 @@ def test_ttp_diversity_properly():
     
     print(f"\n📋 APPROVED HYPOTHESES:")
     for i, (hyp, tac, score) in enumerate(approved, 1):
-        print(f"  {i}. {hyp[:50]}... ({tac}, {score:.1%} overlap)")
+        print(f"  {i}. {hyp[:50]}... ({tac}, {fmt_pct(score)} overlap)")
     
     print(f"\n🚫 REJECTED HYPOTHESES:")
     for i, (hyp, tac, score) in enumerate(rejected, 1):
-        print(f"  {i}. {hyp[:50]}... ({tac}, {score:.1%} overlap)")
+        print(f"  {i}. {hyp[:50]}... ({tac}, {fmt_pct(score)} overlap)")
     
     # Evaluate success
     expected_unique_tactics = len(set(tac for _, tac, _ in approved))
@@ -94,4 +97,9 @@ def test_ttp_diversity_properly():
         return False
 
 if __name__ == "__main__":
-    test_ttp_diversity_properly()
\ No newline at end of file
+    from _test_output import buffered_stdout
+
+    with buffered_stdout():
+        # Pay the one-time corpus load before the timed checks start
+        get_hypothesis_deduplicator().warmup()
+        test_ttp_diversity_properly()
\ No newline at end of file
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for the pytest-based duplicate detection tests.
+
+The deduplicator and the Flames/ corpus are loaded once per session so
+parametrized cases do not each pay the corpus-scan cost.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from _hunt_cache import HUNT_DIR, parse_hunt
+from hypothesis_deduplicator import get_hypothesis_deduplicator
+
+
+@pytest.fixture(scope="session")
+def _seeded_deduplicator():
+    """Session-wide deduplicator seeded with the real hunt corpus."""
+    dedup = get_hypothesis_deduplicator()
+    dedup.clear_generation_history()
+    parsed = (parse_hunt(path) for path in sorted(HUNT_DIR.glob("*.md")))
+    dedup.add_batch([(hypothesis, tactic) for hypothesis, tactic in parsed if hypothesis])
+    return dedup, dedup.snapshot()
+
+
+@pytest.fixture
+def deduplicator(_seeded_deduplicator):
+    """The seeded deduplicator, restored to its snapshot for each test.
+
+    Restoring is a shallow copy, so tests start from identical context
+    without re-parsing the corpus or re-extracting TTPs.
+    """
+    dedup, snap = _seeded_deduplicator
+    dedup.restore(snap)
+    return dedup
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Parametrized duplicate detection tests.
+
+Collapses the near-identical "mock similar hunt" checks from the
+standalone scripts into one parametrized case sharing the session-scoped
+deduplicator fixture.
+"""
+
+import pytest
+
+from hypothesis_deduplicator import DeduplicationResult
+
+SIMILAR_HUNT_CASES = [
+    pytest.param(
+        "Threat actors are using PowerShell Invoke-WebRequest to download "
+        "malicious payloads from remote servers",
+        "Execution",
+        id="powershell-download",
+    ),
+    pytest.param(
+        "Adversaries leverage PowerShell cmdlets for remote command "
+        "execution and payload delivery",
+        "Execution",
+        id="powershell-execution",
+    ),
+    pytest.param(
+        "Malicious actors use scheduled tasks to maintain persistence "
+        "across system reboots",
+        "Persistence",
+        id="scheduled-task-persistence",
+    ),
+]
+
+
+@pytest.mark.parametrize("hypothesis,tactic", SIMILAR_HUNT_CASES)
+def test_uniqueness_check(deduplicator, hypothesis, tactic):
+    """Every mock hunt produces a well-formed deduplication result."""
+    result = deduplicator.check_hypothesis_uniqueness(hypothesis, tactic)
+
+    assert isinstance(result, DeduplicationResult)
+    assert isinstance(result.is_duplicate, bool)
+    assert 0.0 <= result.max_similarity_score <= 1.0
+    assert result.recommendation
+
+
+def test_similar_hunts_sorted(deduplicator):
+    """Similar hunts come back ranked highest-similarity first."""
+    result = deduplicator.check_hypothesis_uniqueness(
+        "Threat actors are using PowerShell to download malicious payloads",
+        "Execution",
+    )
+
+    scores = [hunt.get("similarity_score", 0) for hunt in result.similar_hunts]
+    assert scores == sorted(scores, reverse=True)
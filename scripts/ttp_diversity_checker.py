@@ -3,12 +3,30 @@
 TTP Diversity Checker - Ensures hypothesis regeneration covers different TTPs.
 """
 
+import hashlib
+import os
+import pickle
 import re
 import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from typing import Dict, List, Set, Any, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from enum import IntEnum
+from functools import lru_cache
 from collections import defaultdict
 
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional dependency
+    ahocorasick = None
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
 from logger_config import get_logger
 from config_manager import get_config
 
@@ -16,7 +34,65 @@ logger = get_logger()
 config = get_config().config
 
 
-@dataclass
+class Tactic(IntEnum):
+    """MITRE ATT&CK tactics as bit positions.
+
+    The set of tactics seen across a generation run is tracked as a
+    single integer bitmask: adding one is an OR, counting unique ones is
+    a popcount, and set algebra never hashes a string.
+    """
+    INITIAL_ACCESS = 0
+    EXECUTION = 1
+    PERSISTENCE = 2
+    PRIVILEGE_ESCALATION = 3
+    DEFENSE_EVASION = 4
+    CREDENTIAL_ACCESS = 5
+    DISCOVERY = 6
+    LATERAL_MOVEMENT = 7
+    COLLECTION = 8
+    COMMAND_AND_CONTROL = 9
+    EXFILTRATION = 10
+    IMPACT = 11
+
+    @classmethod
+    def from_name(cls, name: str) -> "Tactic":
+        return cls[name.upper().replace(' ', '_')]
+
+    @property
+    def label(self) -> str:
+        return self.name.lower().replace('_', ' ')
+
+
+# Per-category bit vocabularies for the overlap kernel: each distinct
+# token is interned to a bit position the first time it is seen, so a
+# token set becomes one machine-word mask
+_BIT_VOCABS: Dict[str, Dict[str, int]] = defaultdict(dict)
+
+# Technique patterns compiled once; _regex_techniques runs per extraction.
+_DLL_INJECT = re.compile(r'dll.*(inject|hijack)')
+_SCRIPT = re.compile(r'(script|macro|vba)')
+_PHISH = re.compile(r'(email|attachment|link)')
+
+
+def _pack_mask(category: str, values: Set[str]) -> int:
+    """Intern a token set into the category's bitmask."""
+    vocab = _BIT_VOCABS[category]
+    mask = 0
+    for value in values:
+        bit = vocab.get(value)
+        if bit is None:
+            bit = vocab[value] = len(vocab)
+        mask |= 1 << bit
+    return mask
+
+
+def _mask_jaccard(mask1: int, mask2: int) -> float:
+    """Jaccard similarity on bitmasks: two popcounts, no set hashing."""
+    union = (mask1 | mask2).bit_count()
+    return (mask1 & mask2).bit_count() / union if union else 0.0
+
+
+@dataclass(slots=True)
 class TTPs:
     """TTP classification for a hunt hypothesis."""
     tactic: str
@@ -25,7 +101,13 @@ class TTPs:
     tools: Set[str]
     targets: Set[str]
     data_sources: Set[str]
-    
+    # Bit-packed forms of the sets above, filled in at extraction so the
+    # overlap scorer works on integers instead of hash tables
+    technique_mask: int = 0
+    procedure_mask: int = 0
+    tool_mask: int = 0
+    target_mask: int = 0
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             'tactic': self.tactic,
@@ -37,7 +119,7 @@ class TTPs:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class TTProverlap:
     """TTP overlap analysis result."""
     overlap_score: float  # 0.0 = no overlap, 1.0 = complete overlap
@@ -57,11 +139,11 @@ class TTProvExtractor:
     """Extracts TTPs from hunt hypotheses."""
     
     # MITRE ATT&CK Tactics
-    TACTICS = {
+    TACTICS = frozenset({
         'initial access', 'execution', 'persistence', 'privilege escalation',
         'defense evasion', 'credential access', 'discovery', 'lateral movement',
         'collection', 'command and control', 'exfiltration', 'impact'
-    }
+    })
     
     # Common techniques (normalized)
     TECHNIQUES = {
@@ -107,7 +189,7 @@ class TTProvExtractor:
     }
     
     # Common tools/malware
-    TOOLS = {
+    TOOLS = frozenset({
         'powershell', 'cmd', 'wmic', 'reg', 'sc', 'net', 'netsh', 'certutil',
         'bitsadmin', 'regsvr32', 'rundll32', 'mshta', 'cscript', 'wscript',
         'mimikatz', 'cobalt strike', 'metasploit', 'empire', 'bloodhound',
@@ -116,114 +198,130 @@ class TTProvExtractor:
         'sqlmap', 'hashcat', 'john', 'hydra', 'medusa', 'nikto', 'dirb',
         'chisel', 'ngrok', 'frp', 'proxychains', 'socat', 'netcat', 'nc',
         'stunnel', 'tor', 'proxifier', 'dante', 'ssh', 'plink'
-    }
-    
+    })
+
     # Target systems/services
-    TARGETS = {
+    TARGETS = frozenset({
         'windows', 'linux', 'macos', 'android', 'ios', 'active directory',
         'domain controller', 'sql server', 'mysql', 'postgresql', 'oracle',
         'apache', 'nginx', 'iis', 'tomcat', 'jboss', 'sharepoint', 'exchange',
         'office 365', 'azure', 'aws', 'gcp', 'kubernetes', 'docker', 'vmware',
         'citrix', 'rdp', 'ssh', 'ftp', 'smb', 'nfs', 'dns', 'dhcp', 'vpn'
-    }
+    })
     
+    # Context words used to infer a tactic when none is named outright.
+    # Order matters: earlier entries win when words from several rows
+    # appear, mirroring the original if/elif chain.
+    TACTIC_INFERENCE = (
+        ('execution', ('download', 'execute', 'run', 'launch')),
+        ('persistence', ('persist', 'startup', 'service', 'registry')),
+        ('defense evasion', ('evade', 'bypass', 'hide', 'obfuscate')),
+        ('credential access', ('credential', 'password', 'token', 'hash')),
+        ('discovery', ('scan', 'enumerate', 'discover', 'recon')),
+        ('lateral movement', ('lateral', 'move', 'spread', 'pivot')),
+        ('collection', ('collect', 'gather', 'harvest', 'steal')),
+        ('command and control', ('c2', 'command', 'control', 'beacon')),
+        ('exfiltration', ('exfiltrate', 'leak', 'upload', 'transmit')),
+        ('impact', ('destroy', 'delete', 'encrypt', 'ransom')),
+    )
+
     # Data sources for detection
-    DATA_SOURCES = {
+    DATA_SOURCES = frozenset({
         'windows event logs', 'sysmon', 'process monitoring', 'file monitoring',
         'registry monitoring', 'network traffic', 'dns logs', 'proxy logs',
         'firewall logs', 'web server logs', 'database logs', 'authentication logs',
         'email logs', 'endpoint detection', 'antivirus', 'dlp', 'siem', 'soar',
         'threat intelligence', 'honeypot', 'deception', 'sandboxing'
-    }
-    
+    })
+
     def extract_ttps(self, hypothesis: str, tactic: str = "") -> TTPs:
-        """Extract TTPs from a hunt hypothesis."""
-        hypothesis_lower = hypothesis.lower()
-        
-        # Extract tactic
-        detected_tactic = self._extract_tactic(hypothesis_lower, tactic)
-        
-        # Extract techniques
-        techniques = self._extract_techniques(hypothesis_lower)
-        
-        # Extract procedures (specific implementation details)
-        procedures = self._extract_procedures(hypothesis_lower)
-        
-        # Extract tools
-        tools = self._extract_tools(hypothesis_lower)
-        
-        # Extract targets
-        targets = self._extract_targets(hypothesis_lower)
-        
-        # Extract data sources
-        data_sources = self._extract_data_sources(hypothesis_lower)
-        
-        return TTPs(
-            tactic=detected_tactic,
-            techniques=techniques,
-            procedures=procedures,
-            tools=tools,
-            targets=targets,
-            data_sources=data_sources
-        )
-    
+        """Extract TTPs from a hunt hypothesis.
+
+        Extraction is memoized on the hypothesis text alone (the varying
+        argument); a caller-provided tactic is layered on afterwards so
+        the same text cached under different tactics is still one entry.
+        The layered variant is memoized too, so a repeated
+        (hypothesis, tactic) pair returns the same TTPs instance without
+        re-allocating.
+        """
+        tactic_lower = tactic.lower() if tactic else ""
+        if tactic_lower in self.TACTICS:
+            return _layer_tactic(hypothesis, tactic_lower)
+        return _extract_ttps_from_text(hypothesis)
+
     def _extract_tactic(self, text: str, provided_tactic: str) -> str:
         """Extract MITRE ATT&CK tactic."""
         if provided_tactic and provided_tactic.lower() in self.TACTICS:
             return provided_tactic.lower()
-        
+
         for tactic in self.TACTICS:
             if tactic in text:
                 return tactic
-        
-        # Infer tactic from context
-        if any(word in text for word in ['download', 'execute', 'run', 'launch']):
-            return 'execution'
-        elif any(word in text for word in ['persist', 'startup', 'service', 'registry']):
-            return 'persistence'
-        elif any(word in text for word in ['evade', 'bypass', 'hide', 'obfuscate']):
-            return 'defense evasion'
-        elif any(word in text for word in ['credential', 'password', 'token', 'hash']):
-            return 'credential access'
-        elif any(word in text for word in ['scan', 'enumerate', 'discover', 'recon']):
-            return 'discovery'
-        elif any(word in text for word in ['lateral', 'move', 'spread', 'pivot']):
-            return 'lateral movement'
-        elif any(word in text for word in ['collect', 'gather', 'harvest', 'steal']):
-            return 'collection'
-        elif any(word in text for word in ['c2', 'command', 'control', 'beacon']):
-            return 'command and control'
-        elif any(word in text for word in ['exfiltrate', 'leak', 'upload', 'transmit']):
-            return 'exfiltration'
-        elif any(word in text for word in ['destroy', 'delete', 'encrypt', 'ransom']):
-            return 'impact'
-        
+
+        # Infer tactic from context. One automaton pass collects every
+        # context-word hit; the winner is the highest-priority row of
+        # TACTIC_INFERENCE rather than whichever word appears first in
+        # the text, preserving the old if/elif precedence
+        if _TACTIC_AUTOMATON is not None:
+            best_rank = None
+            for _, (rank, tactic) in _TACTIC_AUTOMATON.iter(text):
+                if best_rank is None or rank < best_rank:
+                    best_rank = rank
+            if best_rank is not None:
+                return self.TACTIC_INFERENCE[best_rank][0]
+        else:
+            for tactic, words in self.TACTIC_INFERENCE:
+                if any(word in text for word in words):
+                    return tactic
+
         return 'execution'  # Default
     
     def _extract_techniques(self, text: str) -> Set[str]:
         """Extract MITRE ATT&CK techniques."""
         techniques = set()
-        
+
         for pattern, technique_id in self.TECHNIQUES.items():
             if pattern in text:
                 techniques.add(technique_id)
-        
-        # Pattern-based detection
-        if re.search(r'dll.*(inject|hijack)', text):
+
+        techniques.update(self._regex_techniques(text))
+        return techniques
+
+    @staticmethod
+    def _regex_techniques(text: str) -> Set[str]:
+        """Pattern-based technique detection beyond plain keyword hits."""
+        techniques = set()
+
+        if _DLL_INJECT.search(text):
             techniques.add('T1055')  # Process Injection / DLL Hijacking
-        
-        if re.search(r'(script|macro|vba)', text):
+
+        if _SCRIPT.search(text):
             techniques.add('T1059')  # Command and Scripting Interpreter
-            
-        if re.search(r'(email|attachment|link)', text):
+
+        if _PHISH.search(text):
             techniques.add('T1566')  # Phishing
-            
+
         return techniques
     
     def _extract_procedures(self, text: str) -> Set[str]:
         """Extract specific procedures/methods."""
+        if _PROCEDURE_AUTOMATON is not None:
+            # One automaton pass collects every atomic keyword hit into a
+            # bitset; each rule is then two integer ANDs
+            bits = 0
+            for _, atom_bit in _PROCEDURE_AUTOMATON.iter(text):
+                bits |= atom_bit
+            return {label for required, any_of, label in _PROCEDURE_RULES
+                    if bits & required == required
+                    and (not any_of or bits & any_of)}
+
+        return self._procedures_brute(text)
+
+    @staticmethod
+    def _procedures_brute(text: str) -> Set[str]:
+        """Substring-scan fallback when pyahocorasick is unavailable."""
         procedures = set()
-        
+
         # Specific command patterns
         if 'invoke-webrequest' in text:
             procedures.add('invoke-webrequest download')
@@ -263,34 +361,286 @@ class TTProvExtractor:
         return procedures
     
     def _extract_tools(self, text: str) -> Set[str]:
-        """Extract tools mentioned in the hypothesis."""
-        tools = set()
-        
-        for tool in self.TOOLS:
-            if tool in text:
-                tools.add(tool)
-        
-        return tools
-    
+        """Extract tools mentioned in the hypothesis.
+
+        Substring matching, like the Aho-Corasick path: the automaton
+        reports keywords anywhere in the text, so the fallback must too
+        or the two paths disagree on hits like 'powershell.exe'.
+        """
+        return {tool for tool in self.TOOLS if tool in text}
+
     def _extract_targets(self, text: str) -> Set[str]:
         """Extract target systems/services."""
-        targets = set()
-        
-        for target in self.TARGETS:
-            if target in text:
-                targets.add(target)
-                
-        return targets
-    
+        return {target for target in self.TARGETS if target in text}
+
     def _extract_data_sources(self, text: str) -> Set[str]:
         """Extract data sources for detection."""
-        data_sources = set()
-        
-        for source in self.DATA_SOURCES:
-            if source in text:
-                data_sources.add(source)
-                
-        return data_sources
+        return {source for source in self.DATA_SOURCES if source in text}
+
+
+# Shared extractor instance behind the memoized text-only extraction;
+# all of its scanning helpers read only class-level keyword tables
+_BASE_EXTRACTOR = TTProvExtractor()
+
+
+# Built automata are cached on disk next to the dedup index so repeat
+# interpreter starts load them instead of re-adding every keyword and
+# re-running make_automaton(). The vocabulary fingerprint in the file
+# name invalidates the cache whenever a table changes.
+_AC_CACHE_DIR = Path(__file__).parent / ".cache"
+
+
+def _cached_automaton(name: str, builder):
+    """Load a saved automaton for ``name`` or build and save one."""
+    automaton = None
+    fingerprint = hashlib.blake2b(
+        repr(sorted(TTProvExtractor.TECHNIQUES.items())).encode()
+        + repr(sorted(TTProvExtractor.TOOLS)).encode()
+        + repr(sorted(TTProvExtractor.TARGETS)).encode()
+        + repr(sorted(TTProvExtractor.DATA_SOURCES)).encode()
+        + repr(TTProvExtractor.TACTIC_INFERENCE).encode()
+        + repr(sorted(_PROCEDURE_ATOMS)).encode(),
+        digest_size=8).hexdigest()
+    path = _AC_CACHE_DIR / f"{name}-{fingerprint}.ac"
+    if path.exists():
+        try:
+            return ahocorasick.load(str(path), pickle.loads)
+        except Exception:  # corrupt or version-incompatible cache
+            pass
+
+    automaton = builder()
+    if automaton is not None:
+        try:
+            _AC_CACHE_DIR.mkdir(exist_ok=True)
+            for stale in _AC_CACHE_DIR.glob(f"{name}-*.ac"):
+                stale.unlink()
+            automaton.save(str(path), pickle.dumps)
+        except OSError:
+            pass  # read-only checkout - building per run still works
+    return automaton
+
+
+def _build_keyword_automaton():
+    """Compile every keyword table into one Aho-Corasick automaton.
+
+    Built once at import, the automaton replaces hundreds of per-call
+    substring tests with a single linear pass; payloads carry the
+    (category, value) pairs so one keyword can feed several buckets
+    (e.g. 'powershell' is both a technique and a tool).
+    """
+    if ahocorasick is None:
+        return None
+
+    payloads = defaultdict(set)
+    for pattern, technique_id in TTProvExtractor.TECHNIQUES.items():
+        payloads[pattern].add(('techniques', technique_id))
+    for tool in TTProvExtractor.TOOLS:
+        payloads[tool].add(('tools', tool))
+    for target in TTProvExtractor.TARGETS:
+        payloads[target].add(('targets', target))
+    for source in TTProvExtractor.DATA_SOURCES:
+        payloads[source].add(('data_sources', source))
+    for tactic in TTProvExtractor.TACTICS:
+        payloads[tactic].add(('tactics', tactic))
+
+    automaton = ahocorasick.Automaton()
+    for keyword, pairs in payloads.items():
+        automaton.add_word(keyword, frozenset(pairs))
+    automaton.make_automaton()
+    return automaton
+
+
+# Atomic keywords for the procedure rules, each assigned one bit. A rule
+# fires when all of its required atoms were seen and, where an
+# alternative group exists, at least one of those - mirroring the
+# AND/OR conjunctions of _procedures_brute
+_PROCEDURE_ATOMS = {
+    atom: 1 << bit for bit, atom in enumerate((
+        'invoke-webrequest', 'certutil', 'download', 'bitsadmin', 'regsvr32',
+        'rundll32', 'mshta', 'scheduled task', 'service', 'create', 'install',
+        'registry', 'modify', 'add', 'dll', 'inject', 'process', 'memory',
+        'socks', 'proxy', 'tunnel', 'bypass', 'conceal', 'chisel', 'c2',
+        'port forwarding',
+    ))
+}
+
+
+def _rule(required, any_of, label):
+    required_mask = 0
+    for atom in required:
+        required_mask |= _PROCEDURE_ATOMS[atom]
+    any_mask = 0
+    for atom in any_of:
+        any_mask |= _PROCEDURE_ATOMS[atom]
+    return (required_mask, any_mask, label)
+
+
+_PROCEDURE_RULES = (
+    _rule(('invoke-webrequest',), (), 'invoke-webrequest download'),
+    _rule(('certutil', 'download'), (), 'certutil download'),
+    _rule(('bitsadmin',), (), 'bitsadmin transfer'),
+    _rule(('regsvr32',), (), 'regsvr32 execution'),
+    _rule(('rundll32',), (), 'rundll32 execution'),
+    _rule(('mshta',), (), 'mshta execution'),
+    _rule(('scheduled task',), (), 'scheduled task persistence'),
+    _rule(('service',), ('create', 'install'), 'service installation'),
+    _rule(('registry',), ('modify', 'add'), 'registry modification'),
+    _rule(('dll', 'inject'), (), 'dll injection'),
+    _rule(('process', 'inject'), (), 'process injection'),
+    _rule(('memory', 'inject'), (), 'memory injection'),
+    _rule(('socks', 'proxy'), (), 'socks proxy creation'),
+    _rule(('tunnel',), ('bypass', 'conceal'), 'network tunneling bypass'),
+    _rule(('chisel',), (), 'chisel tunneling tool usage'),
+    _rule(('proxy', 'c2'), (), 'proxy-based c2 communication'),
+    _rule(('port forwarding',), (), 'port forwarding technique'),
+)
+
+
+def _build_procedure_automaton():
+    """Compile the procedure atoms into one Aho-Corasick automaton."""
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for atom, bit in _PROCEDURE_ATOMS.items():
+        automaton.add_word(atom, bit)
+    automaton.make_automaton()
+    return automaton
+
+
+def _build_tactic_automaton():
+    """Compile the tactic-inference context words into one automaton.
+
+    Payloads carry (row rank, tactic) so a single pass can report every
+    hit and the caller keeps the TACTIC_INFERENCE precedence order.
+    """
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for rank, (tactic, words) in enumerate(TTProvExtractor.TACTIC_INFERENCE):
+        for word in words:
+            automaton.add_word(word, (rank, tactic))
+    automaton.make_automaton()
+    return automaton
+
+
+if ahocorasick is not None:
+    _KEYWORD_AUTOMATON = _cached_automaton('keywords', _build_keyword_automaton)
+    _PROCEDURE_AUTOMATON = _cached_automaton('procedures', _build_procedure_automaton)
+    _TACTIC_AUTOMATON = _cached_automaton('tactics', _build_tactic_automaton)
+else:
+    _KEYWORD_AUTOMATON = _PROCEDURE_AUTOMATON = _TACTIC_AUTOMATON = None
+
+
+@lru_cache(maxsize=4096)
+def _extract_ttps_from_text(text: str) -> TTPs:
+    """Full TTP extraction for one hypothesis text, memoized module-wide.
+
+    The test scripts resubmit the same strings repeatedly; keying the
+    cache on text alone (not the separately supplied tactic) means each
+    distinct hypothesis is scanned for MITRE tokens exactly once.
+    """
+    lower = text.lower()
+
+    if _KEYWORD_AUTOMATON is not None:
+        # One automaton pass over the text covers all keyword tables
+        buckets = defaultdict(set)
+        for _, pairs in _KEYWORD_AUTOMATON.iter(lower):
+            for category, value in pairs:
+                buckets[category].add(value)
+        techniques = buckets['techniques'] | TTProvExtractor._regex_techniques(lower)
+        tools = buckets['tools']
+        targets = buckets['targets']
+        data_sources = buckets['data_sources']
+        # An explicit tactic name in the text comes out of the same
+        # pass; the word-based inference only runs when there is none
+        tactic = (sorted(buckets['tactics'])[0] if buckets['tactics']
+                  else _BASE_EXTRACTOR._extract_tactic(lower, ""))
+    else:
+        techniques = _BASE_EXTRACTOR._extract_techniques(lower)
+        tools = _BASE_EXTRACTOR._extract_tools(lower)
+        targets = _BASE_EXTRACTOR._extract_targets(lower)
+        data_sources = _BASE_EXTRACTOR._extract_data_sources(lower)
+        tactic = _BASE_EXTRACTOR._extract_tactic(lower, "")
+
+    procedures = _BASE_EXTRACTOR._extract_procedures(lower)
+    return TTPs(
+        tactic=tactic,
+        techniques=techniques,
+        procedures=procedures,
+        tools=tools,
+        targets=targets,
+        data_sources=data_sources,
+        technique_mask=_pack_mask('techniques', techniques),
+        procedure_mask=_pack_mask('procedures', procedures),
+        tool_mask=_pack_mask('tools', tools),
+        target_mask=_pack_mask('targets', targets)
+    )
+
+
+# Feature-matrix layout for the vectorized scorer: 12 tactic one-hot
+# columns, then 64 bit columns per masked category. 64 covers every
+# vocabulary here with headroom; records that outgrow it disable the
+# matrix path rather than silently truncating
+_FEATURE_SEGMENTS = (
+    (12, 'technique_mask'), (76, 'procedure_mask'),
+    (140, 'tool_mask'), (204, 'target_mask'),
+)
+_FEATURE_DIM = 12 + 4 * 64
+
+
+def _feature_row(ttps: TTPs):
+    """Encode a record as a uint8 membership row, or None on overflow."""
+    row = np.zeros(_FEATURE_DIM, dtype=np.uint8)
+    row[Tactic.from_name(ttps.tactic)] = 1
+    for offset, field in _FEATURE_SEGMENTS:
+        mask = getattr(ttps, field)
+        if mask >> 64:
+            return None
+        while mask:
+            low = mask & -mask
+            row[offset + low.bit_length() - 1] = 1
+            mask ^= low
+    return row
+
+
+def _masks_of(ttps: TTPs) -> Tuple[str, int, int, int, int]:
+    """Compact, cheaply picklable form of a record for pool workers."""
+    return (ttps.tactic, ttps.technique_mask, ttps.procedure_mask,
+            ttps.tool_mask, ttps.target_mask)
+
+
+def _score_chunk(new: Tuple[str, int, int, int, int],
+                 chunk: List[Tuple[str, int, int, int, int]]) -> Tuple[float, int]:
+    """Best weighted overlap of ``new`` against a chunk of mask tuples.
+
+    Pure function run in pool workers; returns (score, position in
+    chunk), keeping the first position on ties like the serial scan.
+    """
+    best_score = -1.0
+    best_pos = -1
+    for pos, prev in enumerate(chunk):
+        score = (
+            (0.3 if new[0] == prev[0] else 0.0)
+            + _mask_jaccard(new[1], prev[1]) * 0.25
+            + _mask_jaccard(new[2], prev[2]) * 0.2
+            + _mask_jaccard(new[3], prev[3]) * 0.15
+            + _mask_jaccard(new[4], prev[4]) * 0.1
+        )
+        if score > best_score:
+            best_score = score
+            best_pos = pos
+    return best_score, best_pos
+
+
+@lru_cache(maxsize=1024)
+def _layer_tactic(text: str, tactic: str) -> TTPs:
+    """Cached (text, tactic) variant over the text-only extraction."""
+    ttps = _extract_ttps_from_text(text)
+    if tactic != ttps.tactic:
+        return replace(ttps, tactic=tactic)
+    return ttps
 
 
 class TTProvDiversityChecker:
@@ -299,14 +649,180 @@ class TTProvDiversityChecker:
     def __init__(self):
         self.extractor = TTProvExtractor()
         self.generation_history: List[TTPs] = []
+        # Running stats, maintained on every append so get_stats does not
+        # rescan the whole history per call. Tactics live in one bitmask
+        # (extraction always yields a known tactic name)
+        self._tactics_mask: int = 0
+        self._techniques: set = set()
+        self._tools: set = set()
+        self._targets: set = set()
+        # Per-category inverted indexes: item -> history indices carrying
+        # it. A query only scores records sharing an item (or tactic);
+        # everything else has exactly zero overlap and is skipped
+        self._by_tactic: Dict[str, Set[int]] = defaultdict(set)
+        self._by_tech: Dict[str, Set[int]] = defaultdict(set)
+        self._by_proc: Dict[str, Set[int]] = defaultdict(set)
+        self._by_tool: Dict[str, Set[int]] = defaultdict(set)
+        self._by_target: Dict[str, Set[int]] = defaultdict(set)
+        # Hypotheses already checked, so resubmissions short-circuit
+        # before any extraction or scoring work
+        self._seen: Set[Any] = set()
+        # Guards the insert path when callers check from worker threads
+        self._insert_lock = threading.Lock()
+        # Process pool for scoring very large candidate sets; created on
+        # first use so short runs never pay the fork cost
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Row-per-record feature matrix mirroring the history, grown
+        # doubling-style; None until numpy is present and a row is added
+        self._H = None
+        self._H_rows = 0
+        self._H_overflow = False
+
+    # Candidate counts above this fan out to the process pool, scored in
+    # chunks of _PARALLEL_CHUNK mask tuples per task
+    _PARALLEL_THRESHOLD = 500
+    _PARALLEL_CHUNK = 64
+
+    def _parallel_best_candidate(self, new_ttps: TTPs,
+                                 candidates: List[int]) -> Optional[int]:
+        """History index with the highest overlap, scored in the pool."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+        new_masks = _masks_of(new_ttps)
+        chunks = [candidates[i:i + self._PARALLEL_CHUNK]
+                  for i in range(0, len(candidates), self._PARALLEL_CHUNK)]
+        mask_chunks = [[_masks_of(self.generation_history[index]) for index in chunk]
+                       for chunk in chunks]
+
+        best_score = -1.0
+        best_index = None
+        for chunk, (score, pos) in zip(
+                chunks, self._pool.map(_score_chunk,
+                                       [new_masks] * len(chunks), mask_chunks)):
+            if score > best_score:
+                best_score = score
+                best_index = chunk[pos]
+        return best_index
+
+    def _append_feature_row(self, ttps: TTPs):
+        """Mirror one record into the feature matrix (numpy path)."""
+        if np is None or self._H_overflow:
+            return
+        row = _feature_row(ttps)
+        if row is None:
+            self._H_overflow = True
+            return
+        if self._H is None:
+            self._H = np.zeros((16, _FEATURE_DIM), dtype=np.uint8)
+        elif self._H_rows == len(self._H):
+            grown = np.zeros((len(self._H) * 2, _FEATURE_DIM), dtype=np.uint8)
+            grown[:self._H_rows] = self._H
+            self._H = grown
+        self._H[self._H_rows] = row
+        self._H_rows += 1
+
+    def _vector_best_candidate(self, new_ttps: TTPs,
+                               candidates: List[int]) -> Optional[int]:
+        """History index with the highest overlap, scored in one numpy pass."""
+        query = _feature_row(new_ttps)
+        if query is None:
+            return None
+        rows = self._H[np.asarray(candidates, dtype=np.intp)]
+
+        # Same tactic iff the one-hot columns intersect
+        scores = 0.3 * (rows[:, :12] @ query[:12]).astype(np.float64)
+        for (offset, _), weight in zip(_FEATURE_SEGMENTS,
+                                       (0.25, 0.2, 0.15, 0.1)):
+            segment = rows[:, offset:offset + 64]
+            vector = query[offset:offset + 64]
+            inter = (segment & vector).sum(axis=1)
+            union = (segment | vector).sum(axis=1)
+            scores += weight * np.where(union > 0,
+                                        inter / np.maximum(union, 1), 0.0)
+        return candidates[int(np.argmax(scores))]
+
+    def _index_record(self, index: int, ttps: TTPs):
+        """Add one history record to the per-category posting lists."""
+        self._by_tactic[ttps.tactic].add(index)
+        for technique in ttps.techniques:
+            self._by_tech[technique].add(index)
+        for procedure in ttps.procedures:
+            self._by_proc[procedure].add(index)
+        for tool in ttps.tools:
+            self._by_tool[tool].add(index)
+        for target in ttps.targets:
+            self._by_target[target].add(index)
+
+    def _candidate_indices(self, ttps: TTPs) -> Set[int]:
+        """History indices that share at least one item with ``ttps``."""
+        candidates = set(self._by_tactic.get(ttps.tactic, ()))
+        for technique in ttps.techniques:
+            candidates |= self._by_tech.get(technique, set())
+        for procedure in ttps.procedures:
+            candidates |= self._by_proc.get(procedure, set())
+        for tool in ttps.tools:
+            candidates |= self._by_tool.get(tool, set())
+        for target in ttps.targets:
+            candidates |= self._by_target.get(target, set())
+        return candidates
+
+    def _record(self, ttps: TTPs):
+        """Append to history and update the running stats."""
+        with self._insert_lock:
+            index = len(self.generation_history)
+            self.generation_history.append(ttps)
+            self._tactics_mask |= 1 << Tactic.from_name(ttps.tactic)
+            self._techniques.update(ttps.techniques)
+            self._tools.update(ttps.tools)
+            self._targets.update(ttps.targets)
+            self._index_record(index, ttps)
+            self._append_feature_row(ttps)
+
+    def _rebuild_token_index(self):
+        """Rebuild the inverted indexes and target set from the history."""
+        self._by_tactic = defaultdict(set)
+        self._by_tech = defaultdict(set)
+        self._by_proc = defaultdict(set)
+        self._by_tool = defaultdict(set)
+        self._by_target = defaultdict(set)
+        self._targets = set()
+        self._H = None
+        self._H_rows = 0
+        self._H_overflow = False
+        for index, ttps in enumerate(self.generation_history):
+            self._targets.update(ttps.targets)
+            self._index_record(index, ttps)
+            self._append_feature_row(ttps)
         
+    @staticmethod
+    def _seen_key(hypothesis: str):
+        """Dedup key: the string itself, or a digest for long inputs."""
+        if len(hypothesis) < 256:
+            return hypothesis
+        return hashlib.blake2b(hypothesis.encode(), digest_size=16).digest()
+
     def check_ttp_diversity(self, new_hypothesis: str, tactic: str = "") -> TTProverlap:
         """Check if new hypothesis has diverse TTPs compared to previous attempts."""
+        key = self._seen_key(new_hypothesis)
+        if key in self._seen:
+            # Verbatim resubmission - no extraction or scoring needed
+            return TTProverlap(
+                overlap_score=1.0,
+                tactic_match=True,
+                technique_overlap=1.0,
+                procedure_overlap=1.0,
+                tool_overlap=1.0,
+                target_overlap=1.0,
+                explanation="Identical to a previously checked hypothesis"
+            )
+        self._seen.add(key)
+
         new_ttps = self.extractor.extract_ttps(new_hypothesis, tactic)
-        
+
         if not self.generation_history:
             # First hypothesis - automatically diverse, add to history
-            self.generation_history.append(new_ttps)
+            self._record(new_ttps)
             return TTProverlap(
                 overlap_score=0.0,
                 tactic_match=False,
@@ -317,19 +833,42 @@ class TTProvDiversityChecker:
                 explanation="First hypothesis - no previous attempts to compare"
             )
         
-        # Calculate maximum overlap with any previous attempt
+        # Calculate maximum overlap with any previous attempt. Only
+        # records sharing a token or tactic with the query can score
+        # above zero, so the inverted index narrows the scan exactly
         max_overlap = None
         max_overlap_score = 0.0
-        
-        for prev_ttps in self.generation_history:
-            overlap = self._calculate_ttp_overlap(new_ttps, prev_ttps)
-            if overlap.overlap_score > max_overlap_score:
-                max_overlap_score = overlap.overlap_score
-                max_overlap = overlap
+
+        candidates = sorted(self._candidate_indices(new_ttps))
+
+        if len(candidates) > self._PARALLEL_THRESHOLD:
+            # Large candidate sets are scored in bulk: one vectorized
+            # numpy pass over the feature matrix when available, else a
+            # process pool over compact mask tuples. Only the single
+            # winner is rescored here for the full explanation
+            best_index = None
+            if np is not None and not self._H_overflow:
+                best_index = self._vector_best_candidate(new_ttps, candidates)
+            if best_index is None:
+                best_index = self._parallel_best_candidate(new_ttps, candidates)
+            if best_index is not None:
+                overlap = self._calculate_ttp_overlap(
+                    new_ttps, self.generation_history[best_index])
+                if overlap.overlap_score > 0.0:
+                    max_overlap_score = overlap.overlap_score
+                    max_overlap = overlap
+        else:
+            for index in candidates:
+                overlap = self._calculate_ttp_overlap(
+                    new_ttps, self.generation_history[index],
+                    threshold_to_beat=max_overlap_score if max_overlap else -1.0)
+                if overlap is not None and overlap.overlap_score > max_overlap_score:
+                    max_overlap_score = overlap.overlap_score
+                    max_overlap = overlap
         
         # Only add to history if TTPs are diverse enough (not too similar)
         if max_overlap is None or not max_overlap.is_too_similar(threshold=0.5):
-            self.generation_history.append(new_ttps)
+            self._record(new_ttps)
             logger.info(f"Added diverse TTPs to history. Total attempts: {len(self.generation_history)}")
         elif max_overlap and max_overlap.is_too_similar(threshold=0.5):
             logger.warning(f"Rejected similar TTPs. Overlap: {max_overlap.overlap_score:.1%}")
@@ -344,41 +883,51 @@ class TTProvDiversityChecker:
             explanation="No previous attempts found"
         )
     
-    def _calculate_ttp_overlap(self, ttp1: TTPs, ttp2: TTPs) -> TTProverlap:
-        """Calculate overlap between two TTP sets."""
-        
-        # Tactic match
+    # Dimension weights in descending order (tactic 0.3, technique 0.25,
+    # procedure 0.2, tool 0.15, target 0.1) and, parallel to it, the
+    # weight still outstanding after each dimension is scored - the
+    # bailout test is one compare per dimension
+    _WEIGHT_REMAINING = (0.7, 0.45, 0.25, 0.1, 0.0)
+
+    def _calculate_ttp_overlap(self, ttp1: TTPs, ttp2: TTPs,
+                               threshold_to_beat: float = -1.0) -> Optional[TTProverlap]:
+        """Calculate overlap between two TTP sets.
+
+        Dimensions are scored in descending weight order; once the
+        accumulated score plus all remaining weight cannot exceed
+        ``threshold_to_beat``, returns None - the pair cannot become the
+        new maximum, so the cheaper dimensions are never computed.
+        """
+        remaining = self._WEIGHT_REMAINING
+
+        # Tactic match (weight 0.3 - different tactics = very different)
         tactic_match = ttp1.tactic == ttp2.tactic
-        
-        # Technique overlap
-        technique_overlap = self._set_overlap(ttp1.techniques, ttp2.techniques)
-        
-        # Procedure overlap
-        procedure_overlap = self._set_overlap(ttp1.procedures, ttp2.procedures)
-        
-        # Tool overlap
-        tool_overlap = self._set_overlap(ttp1.tools, ttp2.tools)
-        
-        # Target overlap
-        target_overlap = self._set_overlap(ttp1.targets, ttp2.targets)
-        
-        # Calculate overall overlap score (weighted)
-        weights = {
-            'tactic': 0.3,      # High weight - different tactics = very different
-            'technique': 0.25,  # High weight - different techniques = different TTPs
-            'procedure': 0.2,   # Medium weight - specific implementation
-            'tool': 0.15,      # Medium-low weight - tools can be similar
-            'target': 0.1      # Low weight - targets can overlap
-        }
-        
-        overall_score = (
-            (1.0 if tactic_match else 0.0) * weights['tactic'] +
-            technique_overlap * weights['technique'] +
-            procedure_overlap * weights['procedure'] +
-            tool_overlap * weights['tool'] +
-            target_overlap * weights['target']
-        )
-        
+        score = 0.3 if tactic_match else 0.0
+        if score + remaining[0] <= threshold_to_beat:
+            return None
+
+        # Category overlaps on the bit-packed masks: AND/OR plus a
+        # popcount per pair instead of allocating intersection sets
+        technique_overlap = _mask_jaccard(ttp1.technique_mask, ttp2.technique_mask)
+        score += technique_overlap * 0.25
+        if score + remaining[1] <= threshold_to_beat:
+            return None
+
+        procedure_overlap = _mask_jaccard(ttp1.procedure_mask, ttp2.procedure_mask)
+        score += procedure_overlap * 0.2
+        if score + remaining[2] <= threshold_to_beat:
+            return None
+
+        tool_overlap = _mask_jaccard(ttp1.tool_mask, ttp2.tool_mask)
+        score += tool_overlap * 0.15
+        if score + remaining[3] <= threshold_to_beat:
+            return None
+
+        target_overlap = _mask_jaccard(ttp1.target_mask, ttp2.target_mask)
+        score += target_overlap * 0.1
+
+        overall_score = score
+
         # Generate explanation
         explanation = self._generate_overlap_explanation(
             tactic_match, technique_overlap, procedure_overlap, tool_overlap, target_overlap
@@ -394,18 +943,6 @@ class TTProvDiversityChecker:
             explanation=explanation
         )
     
-    def _set_overlap(self, set1: Set[str], set2: Set[str]) -> float:
-        """Calculate Jaccard similarity between two sets."""
-        if not set1 and not set2:
-            return 0.0
-        if not set1 or not set2:
-            return 0.0
-        
-        intersection = set1.intersection(set2)
-        union = set1.union(set2)
-        
-        return len(intersection) / len(union)
-    
     def _generate_overlap_explanation(self, tactic_match: bool, technique_overlap: float,
                                     procedure_overlap: float, tool_overlap: float,
                                     target_overlap: float) -> str:
@@ -437,57 +974,72 @@ class TTProvDiversityChecker:
     def get_diversity_suggestions(self, current_ttps: TTPs) -> List[str]:
         """Get suggestions for more diverse TTPs."""
         suggestions = []
-        
-        # Suggest different tactics
-        used_tactics = {ttps.tactic for ttps in self.generation_history}
+
+        # All reads come from the running stats kept by _record - no
+        # O(N) rescan of the history per call
+        used_tactics = {tactic.label for tactic in Tactic
+                        if self._tactics_mask >> tactic & 1}
         available_tactics = TTProvExtractor.TACTICS - used_tactics
-        
+
         if available_tactics:
             suggestions.append(f"Try different tactics: {', '.join(list(available_tactics)[:3])}")
-        
+
         # Suggest different techniques
-        used_techniques = set()
-        for ttps in self.generation_history:
-            used_techniques.update(ttps.techniques)
-        
-        if len(used_techniques) < 10:  # If we haven't used many techniques
+        if len(self._techniques) < 10:  # If we haven't used many techniques
             suggestions.append("Focus on different MITRE ATT&CK techniques")
-        
+
         # Suggest different targets
-        used_targets = set()
-        for ttps in self.generation_history:
-            used_targets.update(ttps.targets)
-        
-        available_targets = TTProvExtractor.TARGETS - used_targets
+        available_targets = TTProvExtractor.TARGETS - self._targets
         if available_targets:
             suggestions.append(f"Target different systems: {', '.join(list(available_targets)[:3])}")
         
         return suggestions
     
+    def add_batch(self, pairs: List[Tuple[str, str]]):
+        """Seed the history from (hypothesis, tactic) pairs in one pass.
+
+        Skips the per-call max-overlap scan so bulk context loading costs
+        one extraction per hunt instead of N incremental diversity checks.
+        """
+        for hypothesis, tactic in pairs:
+            self._record(self.extractor.extract_ttps(hypothesis, tactic))
+        logger.info(f"Added {len(pairs)} hypotheses to TTP history in batch")
+
     def clear_history(self):
         """Clear generation history."""
         self.generation_history.clear()
+        self._tactics_mask = 0
+        self._techniques.clear()
+        self._tools.clear()
+        self._targets.clear()
+        self._by_tactic.clear()
+        self._by_tech.clear()
+        self._by_proc.clear()
+        self._by_tool.clear()
+        self._by_target.clear()
+        self._seen.clear()
+        self._H = None
+        self._H_rows = 0
+        self._H_overflow = False
+        # Extraction is pure, but resets should leave no state behind
+        _extract_ttps_from_text.cache_clear()
+        _layer_tactic.cache_clear()
         
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about TTP diversity."""
         if not self.generation_history:
             return {"total_attempts": 0}
-        
-        all_tactics = {ttps.tactic for ttps in self.generation_history}
-        all_techniques = set()
-        all_tools = set()
-        
-        for ttps in self.generation_history:
-            all_techniques.update(ttps.techniques)
-            all_tools.update(ttps.tools)
-        
+
+        # O(1) assembly from the running stats - no history rescan; the
+        # tactic count is a popcount on the mask
         return {
             "total_attempts": len(self.generation_history),
-            "unique_tactics": len(all_tactics),
-            "unique_techniques": len(all_techniques),
-            "unique_tools": len(all_tools),
-            "tactics_used": list(all_tactics),
-            "techniques_used": list(all_techniques)
+            "unique_tactics": bin(self._tactics_mask).count("1"),
+            "unique_techniques": len(self._techniques),
+            "unique_tools": len(self._tools),
+            "tactics_used": [tactic.label for tactic in Tactic
+                             if self._tactics_mask >> tactic & 1],
+            "techniques_used": list(self._techniques)
         }
 
 
@@ -3,196 +3,372 @@
 Input validation utilities for HEARTH scripts.
 """
 
+import operator
+import os
 import re
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Dict, List, Any, Union
-from urllib.parse import urlparse
+from typing import Dict, List, Any, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional - the per-tag loop is the fallback
+    njit = prange = None
 
 from logger_config import get_logger
 from exceptions import ValidationError
 
 logger = get_logger()
 
+# Compiled once at import; these run on every hunt submission.
+_TAG_SPLIT = re.compile(r'#?\w+')
+# Allowed tag characters as a set - for the short strings tags are, one
+# C-level set difference beats running the regex engine per tag
+_TAG_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789_.-')
+
+if njit is not None and np is not None:
+    # 256-entry allowed-byte table for the batch kernel; frozen into the
+    # compiled function at first call
+    _TAG_ALLOWED = np.zeros(256, dtype=np.uint8)
+    for _ch in _TAG_CHARS:
+        _TAG_ALLOWED[ord(_ch)] = 1
+
+    @njit(parallel=True, cache=True)
+    def _tag_charset_kernel(buf, offsets, out):  # pragma: no cover - numba
+        for i in prange(offsets.shape[0] - 1):
+            ok = 1
+            for j in range(offsets[i], offsets[i + 1]):
+                if _TAG_ALLOWED[buf[j]] == 0:
+                    ok = 0
+                    break
+            out[i] = ok
+else:
+    _tag_charset_kernel = None
+
+
+def _tag_candidates(tags: Union[str, List[str]]) -> List[str]:
+    """Lowered tag tokens for validation, shared by both entry points."""
+    if isinstance(tags, str):
+        # Documented format is comma/space separated - one C-level
+        # split covers it; inputs carrying other punctuation fall
+        # back to the \w+ scan so their tags still come through
+        lowered = tags.lower()
+        tag_list = lowered.replace(',', ' ').split()
+        if any(set(tag.lstrip('#')) - _TAG_CHARS for tag in tag_list):
+            tag_list = _TAG_SPLIT.findall(lowered)
+        return tag_list
+    if isinstance(tags, list):
+        return [str(tag).lower() for tag in tags]
+    raise ValidationError("tags", tags, "Tags must be string or list")
+
+
+@lru_cache(maxsize=None)
+def _hunt_id_checker(prefix: str):
+    """Specialized checker for one category prefix.
+
+    The prefix is baked into a closure once per category - the per-call
+    work is then just the length/compare/digit tests, with no prefix
+    derivation or pattern dispatch left inside validate_hunt_id.
+    """
+    def check(hunt_id: str) -> bool:
+        digits = hunt_id[1:]
+        return (4 <= len(hunt_id) <= 5
+                and hunt_id[0] == prefix
+                and digits.isascii() and digits.isdigit())
+    return check
+
+
+@lru_cache(maxsize=4096)
+def _validate_hunt_id_cached(hunt_id: str, category: str) -> bool:
+    """Memoized hunt-ID check.
+
+    Hunt IDs come from a small fixed universe and the check is pure, so
+    repeat validations (bulk cross-referencing) become one dict probe.
+    Failures raise before anything is stored, so only successes are
+    cached and a bad ID re-raises on every call.
+    """
+    if not hunt_id or not isinstance(hunt_id, str):
+        raise ValidationError("hunt_id", hunt_id, "Hunt ID must be a non-empty string")
+
+    # Check format: Category prefix + number (e.g., "F001", "E042", "A123")
+    expected_prefix = category[0].upper() if category else "H"
+
+    if not _hunt_id_checker(expected_prefix)(hunt_id):
+        raise ValidationError(
+            "hunt_id", hunt_id,
+            f"Hunt ID must match pattern ^{expected_prefix}\\d{{3,4}}$ (e.g., {expected_prefix}001)"
+        )
+
+    logger.debug("Hunt ID %s validated", hunt_id)
+    return True
+
+
+_URL_VALID = re.compile(r'^https?://[^/\s]+', re.IGNORECASE)
+
+def _validator(field: str, failure: str = "Validation failed"):
+    """Wrap a validator with the shared except/log/re-raise scaffolding.
+
+    Every validator used to repeat the same try/except block inline;
+    the decorator captures the field name and logger once, so the happy
+    path pays only one extra frame and the bodies stay flat.
+    """
+    def decorate(fn):
+        @wraps(fn)
+        def wrapped(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            except ValidationError:
+                raise
+            except Exception as error:
+                logger.error(f"Error validating {field}: {error}")
+                value = args[0] if args else ""
+                raise ValidationError(field, value, f"{failure}: {error}")
+        return wrapped
+    return decorate
+
+
+# Required hunt fields, fetched in one itemgetter call
+_REQUIRED_FIELDS = ('id', 'category', 'title', 'tactic')
+_REQUIRED_GET = operator.itemgetter(*_REQUIRED_FIELDS)
+
 
 class HuntValidator:
     """Validates hunt data and related inputs."""
     
     # Valid MITRE ATT&CK tactics
-    VALID_TACTICS = {
+    VALID_TACTICS = frozenset({
         "Initial Access", "Execution", "Persistence", "Privilege Escalation",
         "Defense Evasion", "Credential Access", "Discovery", "Lateral Movement",
         "Collection", "Command and Control", "Exfiltration", "Impact"
-    }
+    })
+
+    # Lowercase -> canonical casing, so submissions validate regardless
+    # of how the tactic was capitalized
+    _TACTIC_CANONICAL = {tactic.lower(): tactic for tactic in VALID_TACTICS}
     
     @staticmethod
+    @_validator("hunt_id")
     def validate_hunt_id(hunt_id: str, category: str) -> bool:
         """Validate hunt ID format."""
-        try:
-            if not hunt_id or not isinstance(hunt_id, str):
-                raise ValidationError("hunt_id", str(hunt_id), "Hunt ID must be a non-empty string")
-            
-            # Check format: Category prefix + number (e.g., "F001", "E042", "A123")
-            expected_prefix = category[0].upper() if category else "H"
-            pattern = f"^{expected_prefix}\\d{{3,4}}$"
-            
-            if not re.match(pattern, hunt_id):
-                raise ValidationError(
-                    "hunt_id", hunt_id, 
-                    f"Hunt ID must match pattern {pattern} (e.g., {expected_prefix}001)"
-                )
-            
-            logger.debug(f"Hunt ID {hunt_id} validated")
-            return True
-            
-        except ValidationError:
-            raise
-        except Exception as error:
-            logger.error(f"Unexpected error validating hunt ID: {error}")
-            raise ValidationError("hunt_id", hunt_id, f"Validation failed: {error}")
+        # Garbage (unhashable) inputs would trip lru_cache's own
+        # TypeError before the body could report properly
+        if not hunt_id or not isinstance(hunt_id, str) or not isinstance(category, str):
+            return _validate_hunt_id_cached.__wrapped__(hunt_id, category)
+        return _validate_hunt_id_cached(hunt_id, category)
     
     @staticmethod
+    @_validator("tactics")
     def validate_tactics(tactics: Union[str, List[str]]) -> List[str]:
         """Validate and normalize tactics."""
-        try:
-            if isinstance(tactics, str):
-                tactic_list = [t.strip() for t in tactics.split(',') if t.strip()]
-            elif isinstance(tactics, list):
-                tactic_list = [str(t).strip() for t in tactics if str(t).strip()]
-            else:
-                raise ValidationError("tactics", str(tactics), "Tactics must be string or list")
-            
-            invalid_tactics = []
-            valid_tactics = []
-            
-            for tactic in tactic_list:
-                if tactic in HuntValidator.VALID_TACTICS:
-                    valid_tactics.append(tactic)
-                else:
-                    invalid_tactics.append(tactic)
-            
-            if invalid_tactics:
-                logger.warning(f"Invalid tactics found: {invalid_tactics}")
-            
-            logger.debug(f"Validated {len(valid_tactics)} tactics")
-            return valid_tactics
-            
-        except ValidationError:
-            raise
-        except Exception as error:
-            logger.error(f"Error validating tactics: {error}")
-            raise ValidationError("tactics", str(tactics), f"Validation failed: {error}")
+        if isinstance(tactics, str):
+            tactic_list = [t.strip() for t in tactics.split(',') if t.strip()]
+        elif isinstance(tactics, list):
+            tactic_list = [str(t).strip() for t in tactics if str(t).strip()]
+        else:
+            raise ValidationError("tactics", tactics, "Tactics must be string or list")
+
+        # Partition with one C-level set intersection; the
+        # comprehensions just restore input order afterwards
+        canonical = HuntValidator._TACTIC_CANONICAL
+        lowered = [tactic.lower() for tactic in tactic_list]
+        valid_lower = canonical.keys() & frozenset(lowered)
+
+        valid_tactics = [canonical[low] for low in lowered if low in valid_lower]
+
+        # Common case: every tactic validated, so skip the second
+        # pass that only exists to name the offenders
+        if len(valid_tactics) != len(tactic_list):
+            invalid_tactics = [tactic for tactic, low in zip(tactic_list, lowered)
+                               if low not in valid_lower]
+            logger.warning(f"Invalid tactics found: {invalid_tactics}")
+
+        logger.debug("Validated %d tactics", len(valid_tactics))
+        return valid_tactics
     
     @staticmethod
+    @_validator("tags")
     def validate_tags(tags: Union[str, List[str]]) -> List[str]:
         """Validate and normalize tags."""
-        try:
-            if isinstance(tags, str):
-                tag_list = re.findall(r'#?\\w+', tags)
-            elif isinstance(tags, list):
-                tag_list = [str(tag) for tag in tags]
+        # Fast path: tags loaded from canonical JSON are already
+        # clean lowercase strings, so skip normalization and just
+        # dedup. The charset test is what the slow path applies
+        # anyway, so the verdict is identical either way.
+        if isinstance(tags, list) and all(
+            type(tag) is str and tag and tag.isascii()
+            and not (set(tag) - _TAG_CHARS)
+            for tag in tags
+        ):
+            return list(dict.fromkeys(tags))
+
+        tag_list = _tag_candidates(tags)
+
+        # Dedup inline with a seen-guard instead of a second
+        # dict.fromkeys pass over the normalized list
+        seen = set()
+        unique_tags = []
+        for tag in tag_list:
+            clean_tag = tag.strip().lstrip('#')
+            if clean_tag and not (set(clean_tag) - _TAG_CHARS):
+                if clean_tag not in seen:
+                    seen.add(clean_tag)
+                    unique_tags.append(clean_tag)
             else:
-                raise ValidationError("tags", str(tags), "Tags must be string or list")
-            
-            normalized_tags = []
-            for tag in tag_list:
-                clean_tag = re.sub(r'^#', '', tag.strip().lower())
-                if re.match(r'^[a-z0-9_.-]+$', clean_tag) and len(clean_tag) > 0:
-                    normalized_tags.append(clean_tag)
-                else:
-                    logger.warning(f"Invalid tag format: {tag}")
-            
-            unique_tags = list(dict.fromkeys(normalized_tags))
-            
-            logger.debug(f"Validated {len(unique_tags)} tags")
-            return unique_tags
-            
-        except ValidationError:
-            raise
-        except Exception as error:
-            logger.error(f"Error validating tags: {error}")
-            raise ValidationError("tags", str(tags), f"Validation failed: {error}")
+                logger.warning(f"Invalid tag format: {tag}")
+
+        logger.debug("Validated %d tags", len(unique_tags))
+        return unique_tags
     
     @staticmethod
+    def validate_tags_batch(tags_batch: List[Union[str, List[str]]]) -> List[List[str]]:
+        """Validate many hunts' tags in one pass.
+
+        With numba installed the charset check runs as one compiled
+        parallel loop over a packed byte buffer instead of per-tag
+        Python; otherwise each entry goes through validate_tags.
+        Invalid tags are dropped silently here - bulk ingest wants the
+        mask, not a warning per tag.
+        """
+        if _tag_charset_kernel is None:
+            return [HuntValidator.validate_tags(tags) for tags in tags_batch]
+
+        cleaned: List[str] = []
+        owners: List[int] = []
+        for index, tags in enumerate(tags_batch):
+            for tag in _tag_candidates(tags):
+                clean_tag = tag.strip().lstrip('#')
+                if clean_tag:
+                    cleaned.append(clean_tag)
+                    owners.append(index)
+
+        results: List[List[str]] = [[] for _ in tags_batch]
+        if not cleaned:
+            return results
+
+        encoded = [tag.encode('utf-8') for tag in cleaned]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(raw) for raw in encoded], out=offsets[1:])
+        buf = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        mask = np.empty(len(encoded), dtype=np.uint8)
+        _tag_charset_kernel(buf, offsets, mask)
+
+        seen_per_owner: Dict[int, set] = {}
+        for tag, owner, ok in zip(cleaned, owners, mask):
+            if ok and tag not in seen_per_owner.setdefault(owner, set()):
+                seen_per_owner[owner].add(tag)
+                results[owner].append(tag)
+        return results
+
+    @staticmethod
+    @_validator("url", failure="URL validation failed")
     def validate_url(url: str, field_name: str = "url") -> bool:
         """Validate URL format."""
-        try:
-            if not url or not isinstance(url, str):
-                raise ValidationError(field_name, str(url), "URL must be a non-empty string")
-            
-            parsed = urlparse(url)
-            
-            if not parsed.scheme or not parsed.netloc:
-                raise ValidationError(field_name, url, "URL must have scheme and netloc")
-            
-            if parsed.scheme not in ['http', 'https']:
+        if not url or not isinstance(url, str):
+            raise ValidationError(field_name, url, "URL must be a non-empty string")
+
+        # One compiled-regex scan covers the whole rule; urlparse
+        # built a full SplitResult just to read two fields
+        if not _URL_VALID.match(url):
+            scheme, sep, _ = url.partition('://')
+            if sep and scheme and scheme.lower() not in ('http', 'https'):
                 raise ValidationError(field_name, url, "URL scheme must be http or https")
-            
-            logger.debug(f"URL {url} validated")
-            return True
-            
-        except ValidationError:
-            raise
-        except Exception as error:
-            logger.error(f"Error validating URL: {error}")
-            raise ValidationError(field_name, url, f"URL validation failed: {error}")
+            raise ValidationError(field_name, url, "URL must have scheme and netloc")
+
+        logger.debug("URL %s validated", url)
+        return True
     
     @staticmethod
+    @_validator("file_path", failure="Path validation failed")
     def validate_file_path(file_path: Union[str, Path], must_exist: bool = True) -> Path:
         """Validate file path."""
-        try:
-            if not file_path:
-                raise ValidationError("file_path", str(file_path), "File path cannot be empty")
-            
-            path_obj = Path(file_path)
-            
-            if must_exist and not path_obj.exists():
-                raise ValidationError("file_path", str(file_path), "File does not exist")
-            
-            resolved_path = path_obj.resolve()
-            if '..' in str(resolved_path):
-                logger.warning(f"Path contains parent directory references: {file_path}")
-            
-            logger.debug(f"File path {file_path} validated")
-            return path_obj
-            
-        except ValidationError:
-            raise
-        except Exception as error:
-            logger.error(f"Error validating file path: {error}")
-            raise ValidationError("file_path", str(file_path), f"Path validation failed: {error}")
+        if not file_path:
+            raise ValidationError("file_path", file_path, "File path cannot be empty")
+
+        # Syntactic check only - normpath is a pure string operation,
+        # unlike Path.resolve() which stats every component
+        norm = os.path.normpath(os.fspath(file_path))
+
+        if must_exist and not os.path.exists(norm):
+            raise ValidationError("file_path", file_path, "File does not exist")
+
+        if os.pardir in norm.split(os.sep):
+            logger.warning(f"Path contains parent directory references: {file_path}")
+
+        logger.debug("File path %s validated", file_path)
+        return Path(file_path)
     
     @staticmethod
-    def validate_hunt_data(hunt_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate complete hunt data structure."""
+    @_validator("hunt_data", failure="Hunt data validation failed")
+    def validate_hunt_data(hunt_data: Dict[str, Any], copy: bool = True) -> Dict[str, Any]:
+        """Validate complete hunt data structure.
+
+        With ``copy=False`` the normalized fields are written into
+        ``hunt_data`` directly - for callers validating throwaway dicts
+        fresh off the parser, that skips one full-dict copy per hunt.
+        """
+        if not isinstance(hunt_data, dict):
+            raise ValidationError("hunt_data", type(hunt_data).__name__, "Hunt data must be a dictionary")
+
+        # One C-level itemgetter probe fetches all required fields;
+        # the loop then only tests truthiness
         try:
-            if not isinstance(hunt_data, dict):
-                raise ValidationError("hunt_data", str(type(hunt_data)), "Hunt data must be a dictionary")
-            
-            required_fields = ['id', 'category', 'title', 'tactic']
-            for field in required_fields:
-                if field not in hunt_data or not hunt_data[field]:
-                    raise ValidationError(field, str(hunt_data.get(field)), f"Required field {field} is missing or empty")
-            
-            validated_data = hunt_data.copy()
-            
-            HuntValidator.validate_hunt_id(validated_data['id'], validated_data['category'])
-            
-            if 'tactic' in validated_data:
-                validated_data['tactics'] = HuntValidator.validate_tactics(validated_data['tactic'])
-            
-            if 'tags' in validated_data:
-                validated_data['tags'] = HuntValidator.validate_tags(validated_data['tags'])
-            
-            if 'submitter' in validated_data and isinstance(validated_data['submitter'], dict):
-                submitter = validated_data['submitter']
-                if 'link' in submitter and submitter['link']:
-                    HuntValidator.validate_url(submitter['link'], 'submitter_link')
-            
-            logger.info(f"Hunt data validated for {validated_data['id']}")
-            return validated_data
-            
-        except ValidationError:
-            raise
-        except Exception as error:
-            logger.error(f"Error validating hunt data: {error}")
-            raise ValidationError("hunt_data", str(hunt_data), f"Hunt data validation failed: {error}")
\ No newline at end of file
+            required_values = _REQUIRED_GET(hunt_data)
+        except KeyError as missing:
+            field = missing.args[0]
+            raise ValidationError(field, None, f"Required field {field} is missing or empty")
+        for field, value in zip(_REQUIRED_FIELDS, required_values):
+            if not value:
+                raise ValidationError(field, value, f"Required field {field} is missing or empty")
+
+        HuntValidator.validate_hunt_id(hunt_data['id'], hunt_data['category'])
+
+        # Collect normalizations in a patch; the input is only copied
+        # once, on the way out, and only when the caller asked for it
+        patch: Dict[str, Any] = {}
+
+        if 'tactic' in hunt_data:
+            patch['tactics'] = HuntValidator.validate_tactics(hunt_data['tactic'])
+
+        if 'tags' in hunt_data:
+            patch['tags'] = HuntValidator.validate_tags(hunt_data['tags'])
+
+        if 'submitter' in hunt_data and isinstance(hunt_data['submitter'], dict):
+            submitter = hunt_data['submitter']
+            if 'link' in submitter and submitter['link']:
+                HuntValidator.validate_url(submitter['link'], 'submitter_link')
+
+        if copy:
+            validated_data = {**hunt_data, **patch}
+        else:
+            hunt_data.update(patch)
+            validated_data = hunt_data
+
+        logger.info("Hunt data validated for %s", validated_data['id'])
+        return validated_data
+
+    @staticmethod
+    def validate_hunt_data_batch(
+        hunts: List[Dict[str, Any]], copy: bool = True
+    ) -> Tuple[List[Dict[str, Any]], List[ValidationError]]:
+        """Validate a corpus of hunts in one pass.
+
+        Bulk ingest wants the failures listed, not the run aborted, so
+        invalid hunts are collected as ValidationErrors instead of
+        raised. The per-hunt checks are already memoized dict probes
+        (hunt IDs) and fast-pathed (pre-normalized tags), so each row
+        delegates to validate_hunt_data rather than re-deriving the
+        grammar column-wise.
+        """
+        validated: List[Dict[str, Any]] = []
+        errors: List[ValidationError] = []
+        validate = HuntValidator.validate_hunt_data
+        for hunt in hunts:
+            try:
+                validated.append(validate(hunt, copy=copy))
+            except ValidationError as error:
+                errors.append(error)
+        return validated, errors
\ No newline at end of file